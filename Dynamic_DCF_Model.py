@@ -1,10 +1,15 @@
-import yfinance as yf
+import time
+
 import pandas as pd
 import numpy as np
 import streamlit as st
 import matplotlib.pyplot as plt
-import pandas_datareader.data as web
-from datetime import datetime
+
+from dcf.cache import DEFAULT_TTL, QUOTE_TTL
+from dcf.fetch import FetchError
+from dcf.graph import valuation_graph
+from dcf.scenarios import default_scenarios, get_scenario_book
+from dcf.valuation import FADES, Assumptions
 
 st.set_page_config(page_title="MSFT DCF Valuation", layout="wide")
 ticker = st.sidebar.text_input("Enter Ticker Symbol", value="MSFT", max_chars=20).upper()
@@ -24,101 +29,91 @@ if ticker:
         forecast_years = st.sidebar.slider("Forecast Years", 5, 15, 10, help="Number of years to forecast FCFF")
         fcff_growth_rate = st.sidebar.slider("FCFF Growth Rate (%)", 0.0, 30.0, 14.0, help="Annual growth rate for FCFF during forecast period") / 100
         terminal_growth_rate = st.sidebar.slider("Terminal Growth Rate (%)", 0.0, 10.0, 5.0, help="Perpetual growth rate after forecast period") / 100
+        high_growth_years = st.sidebar.slider("High-Growth Years", 0, forecast_years, forecast_years, help="Years at the FCFF growth rate before it fades to terminal growth")
+        fade = st.sidebar.selectbox("Fade to Terminal Growth", FADES, help="How growth steps down after the high-growth years")
+        if high_growth_years >= forecast_years:
+            high_growth_years = None  # single stage
 
         beta = st.sidebar.number_input("Beta", value=1.0, min_value=0.0, step=0.01, help="Stock beta for cost of equity calculation")
         market_return = st.sidebar.number_input("Market Return (%)", value=9.0, min_value=0.0, step=0.1, help="Expected market return") / 100
 
+        st.sidebar.header("Sensitivity Grid")
+        wacc_span = st.sidebar.slider("WACC Range (± % around WACC)", 0.5, 5.0, 1.0, step=0.25, help="Half-width of the WACC axis") / 100
+        wacc_points = st.sidebar.slider("WACC Points", 5, 500, 5, help="Resolution of the WACC axis")
+        g_low, g_high = st.sidebar.slider("Terminal Growth Range (%)", 0.0, 10.0, (3.5, 5.5), step=0.1, help="Terminal growth axis bounds")
+        g_points = st.sidebar.slider("Terminal Growth Points", 5, 500, 5, help="Resolution of the terminal growth axis")
+        tornado_scale = st.sidebar.slider("Tornado Flex (× default step)", 0.25, 3.0, 1.0, step=0.25, help="Scales the ± step each tornado driver is flexed by")
+
+        st.sidebar.header("Monte Carlo")
+        run_monte_carlo = st.sidebar.checkbox("Run Monte Carlo Simulation", value=False)
+        mc_paths = st.sidebar.number_input("Simulated Paths", value=200_000, min_value=1_000, max_value=20_000_000, step=50_000)
+        mc_growth_std = st.sidebar.number_input("FCFF Growth Std Dev (%)", value=3.0, min_value=0.0, step=0.5) / 100
+        mc_terminal_std = st.sidebar.number_input("Terminal Growth Std Dev (%)", value=0.5, min_value=0.0, step=0.1) / 100
+        mc_beta_std = st.sidebar.number_input("Beta Std Dev", value=0.15, min_value=0.0, step=0.05)
+        mc_market_std = st.sidebar.number_input("Market Return Std Dev (%)", value=1.0, min_value=0.0, step=0.1) / 100
+        mc_seed = st.sidebar.number_input("Random Seed", value=42, min_value=0, step=1)
+
         st.sidebar.markdown("---")
         st.sidebar.write("Note: Risk-free rate is pulled from the 10-Year Treasury yield (FRED)")
 
         # --- Data Fetching and Processing ---
+        # One dependency graph per session: only nodes downstream of a changed input recompute
+        if "valuation_graph" not in st.session_state:
+            st.session_state["valuation_graph"] = valuation_graph()
+        graph = st.session_state["valuation_graph"]
+        graph.reset_log()
+        defaults = Assumptions()
+        graph.set(
+            ticker=ticker,
+            data_epoch=int(time.time() // DEFAULT_TTL),  # refetch once the shared cache has expired
+            quote_epoch=int(time.time() // QUOTE_TTL),  # re-quote on the quote cache's shorter TTL
+            forecast_years=forecast_years,
+            fcff_growth_rate=fcff_growth_rate,
+            terminal_growth_rate=terminal_growth_rate,
+            beta=beta,
+            market_return=market_return,
+            tax_rate=defaults.tax_rate,
+            base_years=defaults.base_years,
+            default_cost_of_debt=defaults.default_cost_of_debt,
+            high_growth_years=high_growth_years,
+            fade=fade,
+            wacc_span=wacc_span,
+            wacc_points=wacc_points,
+            g_low=g_low / 100,
+            g_high=g_high / 100,
+            g_points=g_points,
+            tornado_scale=tornado_scale,
+            mc_growth_std=mc_growth_std,
+            mc_terminal_std=mc_terminal_std,
+            mc_beta_std=mc_beta_std,
+            mc_market_std=mc_market_std,
+            mc_paths=mc_paths,
+            mc_seed=mc_seed,
+        )
         with st.spinner("Fetching financial data..."):
-
-            msft = yf.Ticker(ticker)
-            info = msft.info
-
-            # Financial statements
-            income_stmt = msft.financials.T / 1e9
-            balance_sheet = msft.balance_sheet.T / 1e9
-            cash_flow = msft.cash_flow.T / 1e9
-
-            cfo = cash_flow['Cash Flow From Continuing Operating Activities']
-            capex = cash_flow['Capital Expenditure']
-            fcff = cfo + capex
-
-            fcff_df = pd.DataFrame({
-                "Cash From Operations": cfo,
-                "Capex": capex,
-                "Free Cash Flow To The Firm": fcff
-            })
-            fcff_df.sort_index(ascending=True, inplace=True)
-            fcff_df.dropna(how="any", inplace=True)
-
-            # Base FCFF - average last 3 years for stability
-            base_fcff = fcff_df['Free Cash Flow To The Firm'].tail(3).mean()
-
-            last_year = pd.to_datetime(fcff_df.index[-1]).year
-            forecast_years_range = list(range(last_year + 1, last_year + 1 + forecast_years))
-
-            projected_fcff = [base_fcff * (1 + fcff_growth_rate) ** i for i in range(1, forecast_years + 1)]
-            projection_df = pd.DataFrame({
-                "Year": forecast_years_range,
-                "Projected FCFF": projected_fcff
-            }).set_index("Year")
-
-            # Risk free rate from FRED
-            risk_free_rate = web.DataReader('DGS10', 'fred', start='2023-01-01', end=datetime.today()).dropna().iloc[-1, 0] / 100
-
-            market_cap = info["marketCap"] / 1e9
-            total_debt = info.get('totalDebt', 0) / 1e9
-            cash = info.get('totalCash', 0) / 1e9
-            net_debt = total_debt - cash
-
-            # Cost of debt calculation
-            interest_expense = abs(income_stmt['Interest Expense'].dropna().iloc[-1]) if total_debt > 0 else 0
-            cost_of_debt = interest_expense / total_debt if total_debt > 0 else 0.02  # assume 2% if no debt info
-
-            tax_rate = 0.21
-            cost_of_equity = risk_free_rate + beta * (market_return - risk_free_rate)
-
-            total_value = market_cap + net_debt
-            equity_weight = market_cap / total_value if total_value != 0 else 1
-            debt_weight = net_debt / total_value if total_value != 0 else 0
-
-            wacc = (equity_weight * cost_of_equity) + (debt_weight * cost_of_debt * (1 - tax_rate))
-
-            # Discount projected FCFFs
-            discounted_fcffs = [fcff / ((1 + wacc) ** i) for i, fcff in enumerate(projection_df['Projected FCFF'], start=1)]
-
-            # Terminal value calculation and discounting
-            terminal_value = projected_fcff[-1] * (1 + terminal_growth_rate) / (wacc - terminal_growth_rate)
-            terminal_value_discounted = terminal_value / ((1 + wacc) ** forecast_years)
-
-            enterprise_value = sum(discounted_fcffs) + terminal_value_discounted
-            equity_value = enterprise_value - net_debt
-            shares_outstanding = info['sharesOutstanding']
-            fair_value_per_share = (equity_value * 1e9) / shares_outstanding
+            fundamentals = graph.get("fundamentals")
+            result = graph.get("result")
 
         # --- Display Financial Summary ---
         st.subheader("Key Financial Inputs")
         col1, col2 = st.columns(2)
         with col1:
-            st.metric("Market Cap (B)", f"${market_cap:.2f}")
-            st.metric("Total Debt (B)", f"${total_debt:.2f}")
-            st.metric("Total Cash (B)", f"${cash:.2f}")
-            if net_debt >= 0:
-                st.metric("Net Debt (B)", f"${net_debt:.2f}")
+            st.metric("Market Cap (B)", f"${fundamentals.market_cap:.2f}")
+            st.metric("Total Debt (B)", f"${fundamentals.total_debt:.2f}")
+            st.metric("Total Cash (B)", f"${fundamentals.cash:.2f}")
+            if fundamentals.net_debt >= 0:
+                st.metric("Net Debt (B)", f"${fundamentals.net_debt:.2f}")
             else:
                 st.metric("Net Debt", "O(Excess Cash)")
 
-            st.metric("Interest Expense (B)", f"${interest_expense:.2f}")
+            st.metric("Interest Expense (B)", f"${fundamentals.interest_expense:.2f}")
         with col2:
             st.metric("Beta", f"{beta:.2f}")
-            st.metric("Risk-Free Rate", f"{risk_free_rate*100:.2f}%")
+            st.metric("Risk-Free Rate", f"{result.risk_free_rate*100:.2f}%")
             st.metric("Market Return", f"{market_return*100:.2f}%")
-            st.metric("Cost of Debt", f"{cost_of_debt*100:.2f}%")
-            st.metric("Cost of Equity", f"{cost_of_equity*100:.2f}%")
-            st.metric("WACC", f"{wacc*100:.2f}%")
+            st.metric("Cost of Debt", f"{result.cost_of_debt*100:.2f}%")
+            st.metric("Cost of Equity", f"{result.cost_of_equity*100:.2f}%")
+            st.metric("WACC", f"{result.wacc*100:.2f}%")
 
         st.markdown("---")
 
@@ -126,18 +121,33 @@ if ticker:
         st.subheader("Valuation Results")
         st.write(f"**Forecast Period:** {forecast_years} years")
         st.write(f"**FCFF Growth Rate:** {fcff_growth_rate*100:.2f}%")
+        if high_growth_years is not None:
+            st.write(f"**High-Growth Years:** {high_growth_years}, then a {fade} fade to terminal growth")
         st.write(f"**Terminal Growth Rate:** {terminal_growth_rate*100:.2f}%")
 
-        st.metric("Enterprise Value (in Billions)", f"${enterprise_value:.2f}")
-        st.metric("Equity Value (in Billions)", f"${equity_value:.2f}")
-        st.metric("Fair Value per Share", f"${fair_value_per_share:.2f}")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Enterprise Value (in Billions)", f"${result.enterprise_value:.2f}")
+            st.metric("Equity Value (in Billions)", f"${result.equity_value:.2f}")
+            st.metric("Fair Value per Share", f"${result.fair_value_per_share:.2f}")
+
+            implied = graph.get("implied_growth")
+            st.metric("Market-Implied FCFF Growth", "N/A" if np.isnan(implied) else f"{implied*100:.2f}%",
+                      help=f"FCFF growth rate at which fair value equals the current price (${fundamentals.price:.2f})")
+        with col2:
+            # Analytic first-order sensitivities of fair value per share
+            fv_sens = result.fair_value_sensitivities
+            st.metric("Fair Value per +1pp WACC", f"${fv_sens['wacc'] * 0.01:+.2f}")
+            st.metric("Fair Value per +1pp Terminal Growth", f"${fv_sens['terminal_growth_rate'] * 0.01:+.2f}")
+            st.metric("Fair Value per +1pp FCFF Growth", f"${fv_sens['fcff_growth_rate'] * 0.01:+.2f}")
+            st.metric("Fair Value per +0.1 Beta", f"${fv_sens['beta'] * 0.1:+.2f}")
 
         st.markdown("---")
 
         # --- Plot Historical + Projected FCFF ---
-        historical_fcff = fcff_df["Free Cash Flow To The Firm"].tail(3)
+        historical_fcff = fundamentals.fcff_history["Free Cash Flow To The Firm"].tail(3)
         historical_fcff.index = pd.to_datetime(historical_fcff.index).year
-        combined_fcff = pd.concat([historical_fcff, projection_df["Projected FCFF"]])
+        combined_fcff = pd.concat([historical_fcff, result.projection["Projected FCFF"]])
 
         st.subheader("Historical & Projected FCFF")
         fig, ax = plt.subplots(figsize=(10, 5))
@@ -154,28 +164,112 @@ if ticker:
         # --- Sensitivity Analysis ---
         st.subheader("Sensitivity Analysis")
 
-        wacc_range = np.arange(wacc - 0.01, wacc + 0.015, 0.005)
-        g_range = np.arange(0.035, 0.06, 0.005)
-
-        sensitivity_df = pd.DataFrame(index=[f"{round(w*100,1)}%" for w in wacc_range],
-                                    columns=[f"{round(g*100,1)}%" for g in g_range])
+        wacc_range = graph.get("wacc_range")
+        g_range = graph.get("g_range")
+        sensitivity_df = graph.get("sensitivity")
+        grid = sensitivity_df.to_numpy()
+
+        # Colour scale clipped to the bulk of the surface; cells near w == g blow up
+        masked = np.ma.masked_invalid(grid)
+        vmin, vmax = np.nanpercentile(grid, [5, 95]) if masked.count() else (None, None)
+        cmap = plt.get_cmap("RdYlGn").copy()
+        cmap.set_bad("lightgrey")
+
+        fig, ax = plt.subplots(figsize=(10, 6))
+        im = ax.imshow(masked, origin="lower", aspect="auto", cmap=cmap, vmin=vmin, vmax=vmax,
+                       extent=[g_range[0] * 100, g_range[-1] * 100, wacc_range[0] * 100, wacc_range[-1] * 100])
+        ax.plot(terminal_growth_rate * 100, result.wacc * 100, marker="x", color="black")
+        ax.set_title('Fair Value per Share (grey: WACC <= growth)')
+        ax.set_xlabel('Terminal Growth Rate (%)')
+        ax.set_ylabel('WACC (%)')
+        fig.colorbar(im, ax=ax, label='Fair Value per Share ($)')
+        st.pyplot(fig)
 
-        for w in wacc_range:
-            for g in g_range:
-                if w <= g:
-                    sensitivity_df.loc[f"{round(w*100,1)}%", f"{round(g*100,1)}%"] = "N/A"
-                    continue
-                tv = projected_fcff[-1] * (1 + g) / (w - g)
-                tv_disc = tv / ((1 + w) ** forecast_years)
-                ent_val = sum([
-                    fcff / ((1 + w) ** i) for i, fcff in enumerate(projection_df["Projected FCFF"], start=1)
-                ]) + tv_disc
-                eq_val = ent_val - net_debt
-                fair_price = (eq_val * 1e9) / shares_outstanding
-                sensitivity_df.loc[f"{round(w*100,1)}%", f"{round(g*100,1)}%"] = round(fair_price, 2)
+        if grid.size <= 400:
+            st.dataframe(sensitivity_df.style.format("{:.2f}", na_rep="N/A"))
 
-        st.dataframe(sensitivity_df)
+        # --- Tornado ---
+        st.subheader("Tornado: One-at-a-Time Sensitivity")
+        swings = graph.get("tornado").iloc[::-1]  # widest bar on top
+        fair_value = result.fair_value_per_share
+        fig, ax = plt.subplots(figsize=(10, 5))
+        ax.barh(swings.index, swings["low_value"] - fair_value, left=fair_value, color="tab:red", label="Low input")
+        ax.barh(swings.index, swings["high_value"] - fair_value, left=fair_value, color="tab:green", label="High input")
+        ax.axvline(fair_value, color="black", linewidth=1)
+        ax.set_title('Fair Value per Share Swing by Driver')
+        ax.set_xlabel('Fair Value per Share ($)')
+        ax.legend()
+        st.pyplot(fig)
 
+        # --- Scenarios ---
+        st.markdown("---")
+        st.subheader("Scenario Comparison")
+        book = get_scenario_book()
+        col1, col2 = st.columns(2)
+        with col1:
+            scenario_name = st.text_input("Scenario Name", value="", help="Saves the sidebar assumptions under this name for this ticker")
+            if st.button("Save Current Assumptions") and scenario_name.strip():
+                book.save(ticker, scenario_name.strip(), graph.get("assumptions"))
+        saved = book.scenarios(ticker)
+        with col2:
+            to_delete = st.selectbox("Saved Scenario", list(saved), help="Scenario removed by Delete Scenario")
+            if st.button("Delete Scenario") and to_delete:
+                book.delete(ticker, to_delete)
+                saved.pop(to_delete)
+        if not saved:
+            st.caption("No saved scenarios for this ticker yet; showing bear/base/bull around the sidebar assumptions.")
+        scenarios = {"current": graph.get("assumptions"), **saved} if saved else default_scenarios(graph.get("assumptions"))
+        graph.set(scenarios=tuple(scenarios.items()))
+        scenario_table = graph.get("scenario_table")
+
+        percent_rows = {"fcff_growth_rate", "terminal_growth_rate", "market_return", "tax_rate", "default_cost_of_debt", "upside"}
+
+        def format_cell(row, value):
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                return "—"
+            if row in percent_rows:
+                return f"{value*100:.2f}%"
+            if row == "fair_value_per_share":
+                return f"${value:.2f}"
+            if row in {"forecast_years", "base_years", "high_growth_years"}:
+                return f"{int(value)}"
+            return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+        st.dataframe(pd.DataFrame({name: [format_cell(row, v) for row, v in column.items()]
+                                   for name, column in scenario_table.items()}, index=scenario_table.index))
+
+        # --- Monte Carlo Simulation ---
+        if run_monte_carlo:
+            st.markdown("---")
+            st.subheader("Monte Carlo Simulation")
+
+            with st.spinner(f"Simulating {mc_paths:,} paths..."):
+                mc = graph.get("monte_carlo")
+
+            pct = mc.percentiles()
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("5th Percentile", f"${pct[5]:.2f}")
+            col2.metric("Median Fair Value", f"${pct[50]:.2f}")
+            col3.metric("95th Percentile", f"${pct[95]:.2f}")
+            col4.metric("P(Fair Value > Price)", f"{mc.prob_above()*100:.1f}%", help=f"Current price ${mc.price:.2f}")
+            if mc.invalid_fraction > 0:
+                st.caption(f"{mc.invalid_fraction*100:.2f}% of paths had WACC <= terminal growth and were excluded.")
+
+            # Histogram binned while streaming over the 1st-99th percentile of the first block,
+            # so the fat right tail does not flatten it
+            counts, edges = mc.histogram()
+            fig, ax = plt.subplots(figsize=(10, 5))
+            ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge")
+            ax.axvline(mc.price, color="red", linestyle="--", label="Current Price")
+            ax.axvline(pct[50], color="black", label="Median Fair Value")
+            ax.set_title('Distribution of Fair Value per Share')
+            ax.set_xlabel('Fair Value per Share ($)')
+            ax.set_ylabel('Paths')
+            ax.legend()
+            st.pyplot(fig)
+
+    except FetchError as e:
+        st.error(f"⚠️ Could not fetch {e.source} for {ticker}: {e.reason}")
     except Exception as e:
         st.error(f"⚠️ Error fetching data for {ticker} on Yfinance:" + "  Please Enter Another Stock ")
     st.markdown("---")
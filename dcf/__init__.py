@@ -0,0 +1,16 @@
+from .cache import TTLCache, ttl_cache
+from .replay import FixtureStore, set_mode
+from .ratelimit import Scheduler, TokenBucket, get_scheduler, scheduler_stats
+from .providers import BulkFileProvider, Provider, YahooProvider, get_provider, set_provider
+from .store import FundamentalsStore
+from .data import fetch_info, fetch_info_fields, fetch_quote, fetch_statement, fetch_statements
+from .rates import RiskFreeRateStore, get_risk_free_rate
+from .fetch import FetchError, MarketData, fetch_all
+from .valuation import (Assumptions, DCFResult, Fundamentals, assumptions_frame, compute_dcf, normalize_fundamentals,
+                        value_scenarios)
+from .sensitivity import sensitivity_axis, sensitivity_grid, sensitivity_table, tornado
+from .scenarios import ScenarioBook, compare_scenarios, default_scenarios
+from .montecarlo import (Distribution, DrawCache, MonteCarloResult, default_distributions, simulate,
+                         simulate_parallel)
+from .streaming import MonteCarloSummary, TDigest, simulate_streaming
+from .implied import implied_growth, implied_growth_universe, solve_implied_growth
@@ -0,0 +1,276 @@
+"""Value a universe of tickers from the command line.
+
+    python -m dcf.batch tickers.txt -o valuations.jsonl --workers 8
+    python -m dcf.batch sp500.csv -o valuations.parquet
+    python -m dcf.batch --tickers MSFT AAPL GOOGL
+    python -m dcf.batch universe.csv --provider bulk --bulk-dir /data/extracts
+    python -m dcf.batch sp500.csv -o valuations.jsonl --rate 5
+
+Tickers run on a process pool and each result is written as soon as it
+completes. A ticker that fails is written as an error record naming the
+stage and exception instead of aborting the run. The risk-free rate is
+fetched once up front and shared by every ticker. Yahoo calls are paced to
+``--rate`` requests per second across the whole pool, and each record
+carries the seconds it waited for the limiter and the retries it needed.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from .fetch import FetchError, fetch_all
+from .implied import solve_implied_growth
+from .providers import provider_from_env, set_provider
+from .ratelimit import parse_rates, scheduler_stats
+from .rates import get_risk_free_rate
+from .valuation import FADES, Assumptions, compute_dcf, normalize_fundamentals
+
+RECORD_FIELDS = (
+    "ticker", "status", "stage", "error",
+    "fair_value_per_share", "price", "upside", "implied_fcff_growth", "enterprise_value", "equity_value",
+    "wacc", "cost_of_equity", "cost_of_debt", "base_fcff", "market_cap", "net_debt",
+    "shares_outstanding", "risk_free_rate",
+    "dfv_dwacc", "dfv_dterminal_growth", "dfv_dfcff_growth", "dfv_dbeta",
+    "elapsed", "rate_wait", "retries",
+)
+
+TICKER_COLUMNS = ("ticker", "symbol")
+
+
+def read_tickers(path):
+    """Tickers from a text file (one per line) or a CSV constituent list.
+
+    CSV files use their ``Ticker`` or ``Symbol`` column, else the first one.
+    Blank lines and ``#`` comments are skipped; duplicates are dropped.
+    """
+    if path.lower().endswith(".csv"):
+        frame = pd.read_csv(path)
+        column = next((c for c in frame.columns if c.strip().lower() in TICKER_COLUMNS), frame.columns[0])
+        raw = frame[column].dropna().astype(str)
+    else:
+        with open(path) as fh:
+            raw = [line.split("#", 1)[0] for line in fh]
+    tickers = (t.strip().upper() for t in raw)
+    return list(dict.fromkeys(t for t in tickers if t))
+
+
+def _record(ticker, **fields):
+    record = dict.fromkeys(RECORD_FIELDS)
+    record.update(ticker=ticker, **fields)
+    return record
+
+
+def _limiter_totals():
+    stats = scheduler_stats().values()
+    return sum(s["total_wait"] for s in stats), sum(s["retries"] for s in stats)
+
+
+def value_ticker(ticker, assumptions, risk_free_rate):
+    """Fetch and value one ticker; never raises, failures become error records."""
+    # A worker values one ticker at a time, so the change in its limiter totals is this ticker's
+    wait, retries = _limiter_totals()
+    record = _value_ticker(ticker, assumptions, risk_free_rate)
+    wait_after, retries_after = _limiter_totals()
+    record.update(rate_wait=wait_after - wait, retries=retries_after - retries)
+    return record
+
+
+def _value_ticker(ticker, assumptions, risk_free_rate):
+    started = time.monotonic()
+    stage = "fetch"
+    try:
+        data = fetch_all(ticker, risk_free_rate=risk_free_rate)
+        stage = "normalize"
+        fundamentals = normalize_fundamentals(ticker, data.info, data.financials, data.cash_flow)
+        stage = "valuation"
+        result = compute_dcf(fundamentals, assumptions, risk_free_rate)
+        implied = solve_implied_growth(result.base_fcff, result.wacc, assumptions.terminal_growth_rate,
+                                       assumptions.forecast_years, fundamentals.net_debt,
+                                       fundamentals.shares_outstanding, fundamentals.price,
+                                       high_growth_years=assumptions.high_growth_years, fade=assumptions.fade)
+    except FetchError as e:
+        return _record(ticker, status="error", stage=f"fetch:{e.source}", error=e.reason,
+                       elapsed=time.monotonic() - started)
+    except Exception as e:
+        return _record(ticker, status="error", stage=stage, error=f"{type(e).__name__}: {e}",
+                       elapsed=time.monotonic() - started)
+    return _record(
+        ticker,
+        status="ok",
+        fair_value_per_share=float(result.fair_value_per_share),
+        price=float(fundamentals.price),
+        upside=float(result.fair_value_per_share / fundamentals.price - 1),
+        implied_fcff_growth=float(implied),
+        enterprise_value=float(result.enterprise_value),
+        equity_value=float(result.equity_value),
+        wacc=float(result.wacc),
+        cost_of_equity=float(result.cost_of_equity),
+        cost_of_debt=float(result.cost_of_debt),
+        base_fcff=float(result.base_fcff),
+        market_cap=float(fundamentals.market_cap),
+        net_debt=float(fundamentals.net_debt),
+        shares_outstanding=float(fundamentals.shares_outstanding),
+        risk_free_rate=float(risk_free_rate),
+        dfv_dwacc=result.fair_value_sensitivities["wacc"],
+        dfv_dterminal_growth=result.fair_value_sensitivities["terminal_growth_rate"],
+        dfv_dfcff_growth=result.fair_value_sensitivities["fcff_growth_rate"],
+        dfv_dbeta=result.fair_value_sensitivities["beta"],
+        elapsed=time.monotonic() - started,
+    )
+
+
+class JsonlWriter:
+    """One JSON object per line; NaN and infinities (e.g. no implied growth) are written as null."""
+
+    def __init__(self, path):
+        self._fh = sys.stdout if path == "-" else open(path, "w")
+
+    def write(self, record):
+        record = {k: None if isinstance(v, float) and not math.isfinite(v) else v for k, v in record.items()}
+        self._fh.write(json.dumps(record, allow_nan=False) + "\n")
+        self._fh.flush()
+
+    def close(self):
+        if self._fh is not sys.stdout:
+            self._fh.close()
+
+
+class ParquetWriter:
+    """Appends records as row groups of ``batch_size`` rows."""
+
+    def __init__(self, path, batch_size=500):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow: pip install pyarrow")
+        self._pa = pa
+        self._schema = pa.schema(
+            [(name, pa.string()) for name in RECORD_FIELDS[:4]]
+            + [(name, pa.float64()) for name in RECORD_FIELDS[4:]]
+        )
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._batch_size = batch_size
+        self._rows = []
+
+    def write(self, record):
+        self._rows.append(record)
+        if len(self._rows) >= self._batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+def open_writer(path):
+    if path.lower().endswith(".parquet"):
+        return ParquetWriter(path)
+    return JsonlWriter(path)
+
+
+def run(tickers, assumptions, writer, workers=None, risk_free_rate=None, log=sys.stderr):
+    """Value ``tickers`` across a process pool, streaming records to ``writer``.
+
+    Every 100 records a progress line on ``log`` gives the tickers still
+    pending and the mean seconds per ticker spent waiting on the workers'
+    rate limiters, the measure of how hard the limit is binding. Returns a
+    ``{"ok": n, "error": n}`` count of written records.
+    """
+    if risk_free_rate is None:
+        risk_free_rate = get_risk_free_rate()
+    counts = {"ok": 0, "error": 0}
+    waited, retries = 0.0, 0
+    started = time.monotonic()
+    # spawn rather than fork: the HTTP clients underneath are not fork-safe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(value_ticker, t, assumptions, risk_free_rate) for t in tickers]
+        for done, future in enumerate(as_completed(futures), start=1):
+            record = future.result()
+            writer.write(record)
+            counts[record["status"]] += 1
+            waited += record["rate_wait"] or 0.0
+            retries += record["retries"] or 0
+            if record["status"] == "error":
+                print(f"{record['ticker']}: {record['stage']}: {record['error']}", file=log)
+            if done % 100 == 0 or done == len(futures):
+                print(f"[{done}/{len(futures)}] ok={counts['ok']} error={counts['error']} "
+                      f"pending={len(futures) - done} rate_wait={waited / done:.2f}s/ticker retries={retries} "
+                      f"{time.monotonic() - started:.0f}s", file=log)
+    return counts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dcf.batch", description="Batch DCF valuation.")
+    parser.add_argument("ticker_file", nargs="?", help="text file of tickers or CSV constituent list")
+    parser.add_argument("--tickers", nargs="+", default=[], help="tickers given inline")
+    parser.add_argument("-o", "--output", default="-", help="output .jsonl or .parquet path ('-' for stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--provider", choices=("yahoo", "bulk"), help="data provider (default: $DCF_PROVIDER or yahoo)")
+    parser.add_argument("--bulk-dir", help="directory of info/statements/rates extracts for --provider bulk")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Yahoo requests per second across all workers (default: yahoo in $DCF_RATE_LIMIT, or 2)")
+    defaults = Assumptions()
+    parser.add_argument("--forecast-years", type=int, default=defaults.forecast_years)
+    parser.add_argument("--fcff-growth", type=float, default=defaults.fcff_growth_rate * 100, help="percent")
+    parser.add_argument("--terminal-growth", type=float, default=defaults.terminal_growth_rate * 100, help="percent")
+    parser.add_argument("--high-growth-years", type=int, default=None,
+                        help="years at --fcff-growth before fading to terminal growth (default: whole forecast)")
+    parser.add_argument("--fade", choices=FADES, default=defaults.fade)
+    parser.add_argument("--beta", type=float, default=defaults.beta)
+    parser.add_argument("--market-return", type=float, default=defaults.market_return * 100, help="percent")
+    parser.add_argument("--risk-free-rate", type=float, default=None, help="percent; defaults to the latest FRED DGS10")
+    args = parser.parse_args(argv)
+    if not args.ticker_file and not args.tickers:
+        parser.error("give a ticker file or --tickers")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Workers are spawned with this environment, so they pick the same provider
+    if args.provider:
+        os.environ["DCF_PROVIDER"] = args.provider
+    if args.bulk_dir:
+        os.environ["DCF_BULK_DIR"] = args.bulk_dir
+    tickers = list(dict.fromkeys(
+        (read_tickers(args.ticker_file) if args.ticker_file else []) + [t.upper() for t in args.tickers]))
+    # Each worker has its own bucket, so split the run's budget between them
+    workers = max(1, min(args.workers or os.cpu_count(), len(tickers)))
+    rates = parse_rates(os.environ.get("DCF_RATE_LIMIT"))
+    total_rate = args.rate if args.rate is not None else rates["yahoo"]
+    os.environ["DCF_RATE_LIMIT"] = ",".join(
+        f"{name}={rate:g}" for name, rate in {**rates, "yahoo": total_rate / workers}.items())
+    set_provider(provider_from_env())
+    assumptions = Assumptions(
+        forecast_years=args.forecast_years,
+        fcff_growth_rate=args.fcff_growth / 100,
+        terminal_growth_rate=args.terminal_growth / 100,
+        high_growth_years=args.high_growth_years,
+        fade=args.fade,
+        beta=args.beta,
+        market_return=args.market_return / 100,
+    )
+    writer = open_writer(args.output)
+    try:
+        risk_free_rate = None if args.risk_free_rate is None else args.risk_free_rate / 100
+        counts = run(tickers, assumptions, writer, workers=workers, risk_free_rate=risk_free_rate)
+    finally:
+        writer.close()
+    return 0 if counts["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Process-wide TTL caching for provider calls.
+
+Streamlit reruns the page script on every widget change but keeps imported
+modules alive, so a cache held at module level is shared by every session
+served from the same process. On a miss, concurrent callers with the same
+key share one in-flight call (single flight), so sessions opening the same
+ticker at once issue one provider request between them.
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future
+from functools import wraps
+
+# Seconds a fetched object stays fresh; override with DCF_CACHE_TTL.
+DEFAULT_TTL = float(os.environ.get("DCF_CACHE_TTL", 3600))
+
+# Seconds a quote (market cap, share count) stays fresh; override with DCF_QUOTE_TTL.
+QUOTE_TTL = float(os.environ.get("DCF_QUOTE_TTL", 60))
+
+# Where on-disk stores (FRED series, fixtures, fundamentals) live.
+DATA_DIR = os.environ.get("DCF_DATA_DIR", os.path.join(os.path.expanduser("~"), ".cache", "dcf-model"))
+
+
+class TTLCache:
+    """Thread-safe mapping whose entries expire ``ttl`` seconds after insert."""
+
+    def __init__(self, ttl=None, maxsize=256):
+        self.ttl = DEFAULT_TTL if ttl is None else ttl
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                # Evict the entry closest to expiry
+                oldest = min(self._data, key=lambda k: self._data[k][0])
+                del self._data[oldest]
+            self._data[key] = (time.monotonic() + self.ttl, value)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+_MISSING = object()
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one.
+
+    The first caller for a key runs the function; callers arriving while it
+    runs wait for and share its result or exception. ``shared`` counts the
+    calls that were served that way.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future of the in-flight call
+        self.shared = 0
+
+    def do(self, key, func):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return future.result()
+        try:
+            future.set_result(func())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result()
+
+
+def ttl_cache(ttl=None, maxsize=256):
+    """Memoize a function on its arguments for ``ttl`` seconds.
+
+    Concurrent misses on the same arguments share one call. The wrapped
+    function gains ``cache`` (the underlying TTLCache), ``flight`` (its
+    SingleFlight) and ``cache_clear()``.
+    """
+    def decorator(func):
+        cache = TTLCache(ttl=ttl, maxsize=maxsize)
+        flight = SingleFlight()
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                def load():
+                    # A leader that finished between our miss and flight.do() has already stored it
+                    loaded = cache.get(key, _MISSING)
+                    if loaded is not _MISSING:
+                        return loaded
+                    loaded = func(*args, **kwargs)
+                    cache.set(key, loaded)
+                    return loaded
+                value = flight.do(key, load)
+            return value
+
+        wrapper.cache = cache
+        wrapper.flight = flight
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
@@ -0,0 +1,115 @@
+"""Cached access to company fundamentals.
+
+Every function is keyed by ticker and shared across Streamlit sessions, so
+only the first view of a ticker within the TTL pays for the provider calls.
+Data comes from the active dcf.providers provider, whose cache_key is part
+of the cache key.
+
+The model reads only INFO_FIELDS. Market cap and share count come from the
+provider's lighter quote with the shorter QUOTE_TTL. For a remote provider,
+debt and cash come from the latest annual balance sheet, which is fetched
+anyway, so the full quote summary is only requested when the sheet lacks
+those rows. Yahoo's info fields are from the most recent quarter, so this
+trades up to a year of staleness for one fewer slow call; cash includes
+short-term investments either way. Local providers are read from their
+info, which is already on disk.
+
+Statements from a remote provider go through the on-disk FundamentalsStore,
+which only asks the provider once a new fiscal period can exist; in record
+mode they bypass it, so every statement is fetched and saved as a fixture.
+"""
+from . import replay
+from .cache import QUOTE_TTL, ttl_cache
+from .providers import get_provider
+from .replay import STATEMENTS
+from .store import get_fundamentals_store
+
+INFO_FIELDS = ("marketCap", "totalDebt", "totalCash", "sharesOutstanding")
+
+# Annual balance sheet rows standing in for the quote-summary fields
+BALANCE_SHEET_FIELDS = {"totalDebt": "Total Debt", "totalCash": "Cash Cash Equivalents And Short Term Investments"}
+
+
+def _normalize(ticker):
+    return ticker.strip().upper()
+
+
+@ttl_cache()
+def _fetch_info(ticker, provider_key):
+    return get_provider().info(ticker)
+
+
+@ttl_cache()
+def _fetch_info_fields(ticker, provider_key):
+    info = get_provider().info(ticker)
+    return {field: info[field] for field in INFO_FIELDS if field in info}
+
+
+@ttl_cache(ttl=QUOTE_TTL)
+def _fetch_quote(ticker, provider_key):
+    return get_provider().quote(ticker)
+
+
+@ttl_cache()
+def _fetch_statement(ticker, kind, provider_key):
+    provider = get_provider()
+    if provider.local or replay.mode() == "record":
+        return provider.statement(ticker, kind)
+    return get_fundamentals_store().statement(ticker, kind)
+
+
+def fetch_info(ticker):
+    """Quote summary dict in the shape of ``yf.Ticker(ticker).info``."""
+    return _fetch_info(_normalize(ticker), get_provider().cache_key)
+
+
+def fetch_quote(ticker):
+    """Fresh marketCap and sharesOutstanding, cached for QUOTE_TTL seconds."""
+    return _fetch_quote(_normalize(ticker), get_provider().cache_key)
+
+
+def balance_sheet_fields(balance_sheet):
+    """totalDebt and totalCash from the latest period of ``balance_sheet`` reporting each."""
+    fields = {}
+    for field, line_item in BALANCE_SHEET_FIELDS.items():
+        if line_item in balance_sheet.index:
+            values = balance_sheet.loc[line_item].dropna()
+            if len(values):
+                fields[field] = float(values.sort_index().iloc[-1])
+    return fields
+
+
+def info_fields(ticker, quote, balance_sheet):
+    """INFO_FIELDS from a quote and balance sheet; the quote summary fills rows the sheet lacks.
+
+    Local providers keep their own info fields and ignore the sheet.
+    """
+    sheet = {} if get_provider().local else balance_sheet_fields(balance_sheet)
+    fields = {**sheet, **quote}
+    if not fields.keys() >= BALANCE_SHEET_FIELDS.keys():
+        fields = {**_fetch_info_fields(_normalize(ticker), get_provider().cache_key), **fields}
+    return fields
+
+
+def fetch_info_fields(ticker):
+    """INFO_FIELDS with a fresh market cap and share count; see info_fields."""
+    return info_fields(ticker, fetch_quote(ticker), fetch_statement(ticker, "balance_sheet"))
+
+
+def fetch_statement(ticker, kind):
+    """Raw annual statement frame; ``kind`` is one of STATEMENTS."""
+    if kind not in STATEMENTS:
+        raise ValueError(f"Unknown statement {kind!r}, expected one of {STATEMENTS}")
+    return _fetch_statement(_normalize(ticker), kind, get_provider().cache_key)
+
+
+def fetch_statements(ticker):
+    """Income statement, balance sheet and cash flow frames for ``ticker``."""
+    return tuple(fetch_statement(ticker, kind) for kind in STATEMENTS)
+
+
+def clear_cache():
+    _fetch_info.cache_clear()
+    _fetch_info_fields.cache_clear()
+    _fetch_quote.cache_clear()
+    _fetch_statement.cache_clear()
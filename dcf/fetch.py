@@ -0,0 +1,138 @@
+"""Fetch every input the model needs in one parallel stage.
+
+The quote, the three statements and the FRED rate are independent calls,
+so they are issued together on a shared thread pool and joined; wall time
+is roughly the slowest source rather than the sum. The quote and the
+balance sheet are then combined into the info fields the model reads.
+
+Remote calls are paced by dcf.ratelimit, so a source may sit queued for a
+token well past its timeout when many tickers are loading at once. Each
+source's clock therefore starts when a pool thread picks it up and is
+paused while the source waits for a limiter token or a retry backoff;
+everything else, such as waiting on another caller's in-flight fetch or on
+a store's lock, counts.
+"""
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from .data import fetch_quote, fetch_statement, info_fields
+from .ratelimit import on_token
+from .rates import get_risk_free_rate
+
+# Per-source timeouts in seconds, not counting time spent waiting on the rate limiter.
+TIMEOUTS = {
+    "info": 20.0,
+    "financials": 20.0,
+    "balance_sheet": 20.0,
+    "cash_flow": 20.0,
+    "risk_free_rate": 15.0,
+}
+
+MarketData = namedtuple("MarketData", ["info", "financials", "balance_sheet", "cash_flow", "risk_free_rate"])
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="dcf-fetch")
+
+# How often to look again at a source that is still queued for a limiter token
+_QUEUE_POLL = 0.1
+
+
+class FetchError(RuntimeError):
+    """A single data source failed or timed out."""
+
+    def __init__(self, source, ticker, reason):
+        self.source = source
+        self.ticker = ticker
+        self.reason = reason
+        super().__init__(f"{source} for {ticker}: {reason}")
+
+
+def _sources(ticker, risk_free_rate=None):
+    sources = {
+        "info": lambda: fetch_quote(ticker),
+        "financials": lambda: fetch_statement(ticker, "financials"),
+        "balance_sheet": lambda: fetch_statement(ticker, "balance_sheet"),
+        "cash_flow": lambda: fetch_statement(ticker, "cash_flow"),
+        "risk_free_rate": get_risk_free_rate,
+    }
+    if risk_free_rate is not None:
+        sources["risk_free_rate"] = lambda: risk_free_rate
+    return sources
+
+
+class _Clock:
+    """Time a source has run against its timeout, paused during limiter waits."""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self._spent = 0.0
+        self._since = None  # when the clock last resumed; None while paused
+        self._lock = threading.Lock()
+
+    def token(self, granted):
+        """on_token() callback: pause while waiting, resume once granted."""
+        with self._lock:
+            now = time.monotonic()
+            if granted and self._since is None:
+                self._since = now
+            elif not granted and self._since is not None:
+                self._spent += now - self._since
+                self._since = None
+
+    def remaining(self):
+        """Seconds left, or None while paused."""
+        with self._lock:
+            if self._since is None:
+                return None
+            return max(0.0, self.timeout - self._spent - (time.monotonic() - self._since))
+
+
+def _run(call, clock):
+    # Queued behind other sources' limiter waits until now, so start here rather than at submission
+    clock.token(True)
+    with on_token(clock.token):
+        return call()
+
+
+def _result(future, clock):
+    """Wait for ``future`` until its clock runs out, looking again every _QUEUE_POLL seconds while paused."""
+    while True:
+        remaining = clock.remaining()
+        try:
+            return future.result(timeout=_QUEUE_POLL if remaining is None else remaining)
+        except FutureTimeout:
+            if clock.remaining() == 0.0:
+                raise
+
+
+def fetch_all(ticker, timeouts=None, risk_free_rate=None):
+    """Run all sources concurrently and return a MarketData.
+
+    Passing ``risk_free_rate`` skips the FRED source, which batch runs fetch
+    once up front. Raises FetchError naming the first source (in MarketData
+    order) that raised or did not finish within its timeout; time spent
+    waiting for a rate-limiter token does not count towards it.
+    """
+    timeouts = {**TIMEOUTS, **(timeouts or {})}
+    clocks = {name: _Clock(timeouts[name]) for name in MarketData._fields}
+    futures = {name: _executor.submit(_run, call, clocks[name])
+               for name, call in _sources(ticker, risk_free_rate).items()}
+
+    results = {}
+    try:
+        for name in MarketData._fields:
+            try:
+                results[name] = _result(futures[name], clocks[name])
+            except FutureTimeout:
+                raise FetchError(name, ticker, f"timed out after {timeouts[name]:g}s") from None
+            except Exception as e:
+                raise FetchError(name, ticker, f"{type(e).__name__}: {e}") from e
+        try:
+            results["info"] = info_fields(ticker, results["info"], results["balance_sheet"])
+        except Exception as e:
+            raise FetchError("info", ticker, f"{type(e).__name__}: {e}") from e
+    finally:
+        for future in futures.values():
+            future.cancel()
+    return MarketData(**results)
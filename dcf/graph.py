@@ -0,0 +1,210 @@
+"""Incremental valuation as a dependency graph of memoized nodes.
+
+Each node is a function of named inputs or other nodes. A node remembers
+the versions of the dependencies it was last computed from and recomputes
+only when one of them changes; when a recomputed value compares equal to
+the old one its version is kept, so nothing downstream reruns either. Moving
+only the terminal-growth slider therefore re-evaluates terminal_value and
+what depends on it, not the fetch, the FCFF projection or the WACC inputs.
+
+    graph = valuation_graph()
+    graph.set(ticker="MSFT", forecast_years=10, ...)
+    graph.get("fair_value_per_share")
+    graph.recomputed  # nodes evaluated by the last get() calls
+"""
+import numpy as np
+import pandas as pd
+
+from .data import fetch_quote
+from .fetch import fetch_all
+from .implied import solve_implied_growth
+from .montecarlo import DrawCache, default_distributions
+from .scenarios import compare_scenarios
+from .sensitivity import label_grid, sensitivity_axis, sensitivity_grid, tornado
+from .streaming import simulate_streaming
+from .valuation import (Assumptions, DCFResult, base_fcff, capital_weights, compute_wacc, cost_of_debt,
+                        cost_of_equity, discount, enterprise_value_parts, growth_schedule, normalize_fundamentals,
+                        per_share, project_schedule, terminal_value, valuation_sensitivities)
+
+
+def _same(old, new):
+    """True only when ``old == new`` is a definite boolean True (arrays and frames compare whole)."""
+    if old is new:
+        return True
+    if isinstance(old, np.ndarray) or isinstance(new, np.ndarray):
+        return isinstance(old, np.ndarray) and isinstance(new, np.ndarray) and np.array_equal(old, new)
+    if isinstance(old, (pd.Series, pd.DataFrame)):
+        return type(old) is type(new) and old.equals(new)
+    try:
+        equal = old == new
+    except Exception:
+        return False
+    return isinstance(equal, (bool, np.bool_)) and bool(equal)
+
+
+class Graph:
+    def __init__(self):
+        self._nodes = {}  # name -> (func, deps)
+        self._values = {}
+        self._versions = {}
+        self._stamps = {}  # name -> dependency versions it was computed from
+        self.recomputed = []
+
+    def add(self, name, func, deps):
+        self._nodes[name] = (func, tuple(deps))
+
+    def set(self, **inputs):
+        """Set input values; unchanged values keep their version."""
+        for name, value in inputs.items():
+            if name in self._nodes:
+                raise ValueError(f"{name!r} is a computed node, not an input")
+            if name in self._values and _same(self._values[name], value):
+                continue
+            self._store(name, value)
+
+    def _store(self, name, value):
+        self._values[name] = value
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+    def get(self, name):
+        if name not in self._nodes:
+            if name not in self._values:
+                raise KeyError(f"Input {name!r} has not been set")
+            return self._values[name]
+        func, deps = self._nodes[name]
+        args = [self.get(dep) for dep in deps]
+        stamp = tuple(self._versions[dep] for dep in deps)
+        if self._stamps.get(name) != stamp:
+            value = func(*args)
+            if not (name in self._values and _same(self._values[name], value)):
+                self._store(name, value)
+            self._stamps[name] = stamp
+            self.recomputed.append(name)
+        return self._values[name]
+
+    def reset_log(self):
+        self.recomputed = []
+
+
+def _projection(fundamentals, projected_fcff):
+    years = range(fundamentals.last_year + 1, fundamentals.last_year + 1 + len(projected_fcff))
+    return pd.DataFrame({
+        "Year": list(years),
+        "Projected FCFF": projected_fcff
+    }).set_index("Year")
+
+
+def _result(assumptions, base, projection, risk_free_rate, kd, ke, weights, wacc, discounted_fcffs,
+            tv, tv_discounted, ev, equity_value, fair_value, sensitivities):
+    return DCFResult(
+        assumptions=assumptions,
+        base_fcff=base,
+        projection=projection,
+        risk_free_rate=risk_free_rate,
+        cost_of_debt=kd,
+        cost_of_equity=ke,
+        equity_weight=weights[0],
+        debt_weight=weights[1],
+        wacc=wacc,
+        discounted_fcffs=discounted_fcffs,
+        terminal_value=tv,
+        terminal_value_discounted=tv_discounted,
+        enterprise_value=ev,
+        equity_value=equity_value,
+        fair_value_per_share=fair_value,
+        ev_sensitivities=sensitivities[0],
+        fair_value_sensitivities=sensitivities[1],
+    )
+
+
+def valuation_graph():
+    """Graph of the page's valuation.
+
+    Inputs: ticker, data_epoch (bump to refetch), quote_epoch (bump to
+    re-quote market cap and share count), forecast_years, fcff_growth_rate,
+    terminal_growth_rate, beta, market_return, tax_rate, base_years,
+    default_cost_of_debt, high_growth_years, fade, the sensitivity axes
+    (wacc_span, wacc_points, g_low, g_high, g_points), tornado_scale,
+    scenarios (a tuple of (name, Assumptions) pairs) and
+    the Monte Carlo settings (mc_growth_std, mc_terminal_std, mc_beta_std,
+    mc_market_std, mc_paths, mc_seed). Nodes are only evaluated when asked
+    for, so the sensitivity and Monte Carlo nodes cost nothing unless shown.
+    The graph keeps its own DrawCache, so a session's Monte Carlo reruns
+    reuse their standard draws.
+    """
+    g = Graph()
+    draws = DrawCache()
+    g.add("market_data", lambda ticker, epoch: fetch_all(ticker), ["ticker", "data_epoch"])
+    # A new quote only moves the price-driven nodes: base FCFF and the cost of
+    # debt recompute to equal values, so nothing below them reruns
+    g.add("quote", lambda ticker, epoch: fetch_quote(ticker), ["ticker", "quote_epoch"])
+    g.add("fundamentals",
+          lambda ticker, data, quote: normalize_fundamentals(ticker, {**data.info, **quote}, data.financials,
+                                                             data.cash_flow),
+          ["ticker", "market_data", "quote"])
+    g.add("risk_free_rate", lambda data: data.risk_free_rate, ["market_data"])
+    g.add("assumptions", Assumptions,
+          ["forecast_years", "fcff_growth_rate", "terminal_growth_rate", "beta", "market_return",
+           "tax_rate", "base_years", "default_cost_of_debt", "high_growth_years", "fade"])
+
+    g.add("base_fcff", base_fcff, ["fundamentals", "base_years"])
+    g.add("growth_schedule", growth_schedule,
+          ["fcff_growth_rate", "terminal_growth_rate", "forecast_years", "high_growth_years", "fade"])
+    g.add("projected_fcff", project_schedule, ["base_fcff", "growth_schedule"])
+    g.add("projection", _projection, ["fundamentals", "projected_fcff"])
+
+    g.add("cost_of_debt", cost_of_debt, ["fundamentals", "default_cost_of_debt"])
+    g.add("cost_of_equity", cost_of_equity, ["risk_free_rate", "beta", "market_return"])
+    g.add("capital_weights", lambda f: capital_weights(f.market_cap, f.net_debt), ["fundamentals"])
+    g.add("wacc", lambda w, ke, kd, tax: compute_wacc(w[0], w[1], ke, kd, tax),
+          ["capital_weights", "cost_of_equity", "cost_of_debt", "tax_rate"])
+
+    g.add("discounted_fcffs", discount, ["projected_fcff", "wacc"])
+    g.add("explicit_pv",
+          lambda base, growth, wacc, tg, n, high, fade: float(
+              enterprise_value_parts(base, growth, wacc, tg, n, high, fade)[0]),
+          ["base_fcff", "fcff_growth_rate", "wacc", "terminal_growth_rate", "forecast_years", "high_growth_years",
+           "fade"])
+    g.add("terminal_value", lambda fcff, tg, wacc: terminal_value(fcff[-1], tg, wacc),
+          ["projected_fcff", "terminal_growth_rate", "wacc"])
+    g.add("terminal_value_discounted", lambda tv, wacc, n: tv / ((1 + wacc) ** n),
+          ["terminal_value", "wacc", "forecast_years"])
+    g.add("enterprise_value", lambda pv, tv: pv + tv, ["explicit_pv", "terminal_value_discounted"])
+    g.add("equity_value", lambda ev, f: ev - f.net_debt, ["enterprise_value", "fundamentals"])
+    g.add("fair_value_per_share", lambda eq, f: per_share(eq, f.shares_outstanding), ["equity_value", "fundamentals"])
+    g.add("value_sensitivities",
+          lambda base, growth, wacc, tg, n, weights, mr, rf, f, high, fade: valuation_sensitivities(
+              base, growth, wacc, tg, n, weights[0], mr, rf, f.shares_outstanding, high, fade),
+          ["base_fcff", "fcff_growth_rate", "wacc", "terminal_growth_rate", "forecast_years", "capital_weights",
+           "market_return", "risk_free_rate", "fundamentals", "high_growth_years", "fade"])
+    g.add("result", _result,
+          ["assumptions", "base_fcff", "projection", "risk_free_rate", "cost_of_debt", "cost_of_equity",
+           "capital_weights", "wacc", "discounted_fcffs", "terminal_value", "terminal_value_discounted",
+           "enterprise_value", "equity_value", "fair_value_per_share", "value_sensitivities"])
+
+    g.add("implied_growth",
+          lambda base, wacc, tg, n, f, high, fade: float(solve_implied_growth(
+              base, wacc, tg, n, f.net_debt, f.shares_outstanding, f.price, high_growth_years=high, fade=fade)),
+          ["base_fcff", "wacc", "terminal_growth_rate", "forecast_years", "fundamentals", "high_growth_years",
+           "fade"])
+
+    g.add("wacc_range", lambda wacc, span, points: sensitivity_axis(wacc - span, wacc + span, points),
+          ["wacc", "wacc_span", "wacc_points"])
+    g.add("g_range", sensitivity_axis, ["g_low", "g_high", "g_points"])
+    g.add("sensitivity",
+          lambda base, growth, n, f, wr, gr, high, fade: label_grid(
+              sensitivity_grid(base, growth, n, f.net_debt, f.shares_outstanding, wr, gr, high, fade), wr, gr),
+          ["base_fcff", "fcff_growth_rate", "forecast_years", "fundamentals", "wacc_range", "g_range",
+           "high_growth_years", "fade"])
+    g.add("tornado", lambda f, a, rf, scale: tornado(f, a, rf, scale=scale),
+          ["fundamentals", "assumptions", "risk_free_rate", "tornado_scale"])
+    g.add("scenario_table", lambda f, rf, scenarios: compare_scenarios(f, rf, dict(scenarios)),
+          ["fundamentals", "risk_free_rate", "scenarios"])
+
+    g.add("mc_distributions", default_distributions,
+          ["assumptions", "mc_growth_std", "mc_terminal_std", "mc_beta_std", "mc_market_std"])
+    g.add("monte_carlo",
+          lambda f, a, rf, dists, paths, seed: simulate_streaming(f, a, rf, dists, n_paths=int(paths),
+                                                                  seed=int(seed), cache=draws),
+          ["fundamentals", "assumptions", "risk_free_rate", "mc_distributions", "mc_paths", "mc_seed"])
+    return g
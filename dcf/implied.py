@@ -0,0 +1,88 @@
+"""Reverse DCF: the FCFF growth rate the market price implies.
+
+Holding WACC, terminal growth and the forecast period fixed, fair value per
+share rises monotonically with fcff_growth_rate whenever base FCFF is
+positive, so the implied rate is bracketed and found with the Illinois
+variant of false position. The solver runs element-wise on arrays, so a
+whole universe is solved in one call of a few dozen vectorized iterations.
+"""
+import numpy as np
+import pandas as pd
+
+from .montecarlo import PathModel
+from .valuation import compute_wacc, cost_of_equity, enterprise_value
+
+DEFAULT_BRACKET = (-0.5, 1.0)
+
+
+def _ev_gap(growth, base_fcff, wacc, terminal_growth_rate, forecast_years, high_growth_years, fade, target_ev):
+    ev = enterprise_value(base_fcff, growth, wacc, terminal_growth_rate, forecast_years, high_growth_years, fade)
+    return ev - target_ev
+
+
+def solve_implied_growth(base_fcff, wacc, terminal_growth_rate, forecast_years, net_debt, shares_outstanding,
+                         price, bracket=DEFAULT_BRACKET, xtol=1e-10, maxiter=100, high_growth_years=None,
+                         fade="linear"):
+    """fcff_growth_rate at which fair value per share equals ``price``.
+
+    All arguments except ``forecast_years``, ``bracket`` and the fade
+    settings broadcast. With a fade, the solved rate is the high-phase rate.
+    Elements come back NaN when base FCFF is not positive, WACC does not
+    exceed terminal growth, or the price is not reachable inside ``bracket``.
+    """
+    base_fcff, wacc, terminal_growth_rate, net_debt, shares_outstanding, price = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in
+          (base_fcff, wacc, terminal_growth_rate, net_debt, shares_outstanding, price)))
+    target_ev = price * shares_outstanding / 1e9 + net_debt
+    args = (base_fcff, wacc, terminal_growth_rate, forecast_years, high_growth_years, fade, target_ev)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = np.full(target_ev.shape, bracket[0])
+        b = np.full(target_ev.shape, bracket[1])
+        fa = _ev_gap(a, *args)
+        fb = _ev_gap(b, *args)
+        valid = (base_fcff > 0) & (wacc > terminal_growth_rate) & (fa * fb <= 0)
+        root = np.where(fa == 0, a, b)
+        active = valid & (fa != 0) & (fb != 0)
+
+        for _ in range(maxiter):
+            if not active.any():
+                break
+            c = b - fb * (b - a) / (fb - fa)
+            fc = _ev_gap(c, *args)
+            flipped = fc * fb < 0
+            # Illinois step: halve the stale endpoint's value when the bracket does not flip
+            a, fa = np.where(flipped, b, a), np.where(flipped, fb, fa / 2)
+            b, fb = c, fc
+            root = np.where(active, c, root)
+            active &= (np.abs(b - a) > xtol) & (fc != 0)
+    return np.where(valid, root, np.nan)
+
+
+def implied_growth(fundamentals, assumptions, risk_free_rate, price=None):
+    """Market-implied fcff_growth_rate for one company (at its market price by default)."""
+    return float(implied_growth_universe([fundamentals], assumptions, risk_free_rate,
+                                         None if price is None else [price]).iloc[0])
+
+
+def implied_growth_universe(fundamentals, assumptions, risk_free_rate, prices=None):
+    """Implied growth for every Fundamentals in ``fundamentals`` in one vectorized solve.
+
+    Returns a Series indexed by ticker. ``prices`` defaults to each
+    company's market price.
+    """
+    models = [PathModel.from_inputs(f, assumptions, risk_free_rate) for f in fundamentals]
+
+    def column(attr):
+        return np.array([getattr(m, attr) for m in models], dtype=float)
+
+    ke = cost_of_equity(risk_free_rate, assumptions.beta, assumptions.market_return)
+    wacc = compute_wacc(column("equity_weight"), column("debt_weight"), ke, column("cost_of_debt"),
+                        assumptions.tax_rate)
+    if prices is None:
+        prices = [f.price for f in fundamentals]
+    growth = solve_implied_growth(column("base_fcff"), wacc, assumptions.terminal_growth_rate,
+                                  assumptions.forecast_years, column("net_debt"), column("shares_outstanding"),
+                                  np.asarray(prices, dtype=float), high_growth_years=assumptions.high_growth_years,
+                                  fade=assumptions.fade)
+    return pd.Series(growth, index=[f.ticker for f in fundamentals], name="implied_fcff_growth")
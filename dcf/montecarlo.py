@@ -0,0 +1,266 @@
+"""Monte Carlo valuation over uncertain DCF inputs.
+
+fcff_growth_rate, terminal_growth_rate, beta and market_return are drawn
+from configurable distributions and every path is valued with array math.
+Paths are processed in chunks so memory stays bounded however many are
+requested. Each distribution is a transform of a standard normal or
+standard uniform draw, which keeps sampling cheap and the transforms pure.
+
+Paths are split into fixed-size blocks and each block draws from its own
+stream spawned from one SeedSequence. A given seed therefore gives the same
+paths whether the blocks run in this process or across a process pool, and
+whatever the number of workers.
+
+Within a block every sampled input has its own child stream, so its
+standard draws depend only on the seed, the block and the input. That makes
+them common random numbers: a DrawCache keeps them between runs and a change
+of assumptions only re-transforms and re-values the same draws.
+"""
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .valuation import (base_fcff, capital_weights, compute_wacc, cost_of_debt, cost_of_equity,
+                        enterprise_value, per_share)
+
+SAMPLED_INPUTS = ("fcff_growth_rate", "terminal_growth_rate", "beta", "market_return")
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """A named distribution defined by how it maps a standard draw."""
+    kind: str
+    params: tuple
+
+    @property
+    def standard(self):
+        """Which standard variate the transform consumes: "normal" or "uniform"."""
+        return "normal" if self.kind == "normal" else "uniform"
+
+    def transform(self, x):
+        p = self.params
+        if self.kind == "fixed":
+            return np.full(np.shape(x), p[0], dtype=float)
+        if self.kind == "normal":
+            return p[0] + p[1] * x
+        if self.kind == "uniform":
+            return p[0] + (p[1] - p[0]) * x
+        if self.kind == "triangular":
+            low, mode, high = p
+            cut = (mode - low) / (high - low)
+            return np.where(x < cut,
+                            low + np.sqrt(x * (high - low) * (mode - low)),
+                            high - np.sqrt((1 - x) * (high - low) * (high - mode)))
+        raise ValueError(f"Unknown distribution {self.kind!r}")
+
+
+def fixed(value):
+    return Distribution("fixed", (value,))
+
+
+def normal(mean, std):
+    return Distribution("normal", (mean, std))
+
+
+def uniform(low, high):
+    return Distribution("uniform", (low, high))
+
+
+def triangular(low, mode, high):
+    if not low <= mode <= high or low == high:
+        raise ValueError("triangular needs low <= mode <= high and low < high")
+    return Distribution("triangular", (low, mode, high))
+
+
+@dataclass(frozen=True)
+class PathModel:
+    """Scalars every path shares; picklable so it can be shipped to workers."""
+    base_fcff: float
+    risk_free_rate: float
+    cost_of_debt: float
+    equity_weight: float
+    debt_weight: float
+    tax_rate: float
+    forecast_years: int
+    net_debt: float
+    shares_outstanding: float
+    high_growth_years: int = None
+    fade: str = "linear"
+
+    @classmethod
+    def from_inputs(cls, fundamentals, assumptions, risk_free_rate):
+        equity_weight, debt_weight = capital_weights(fundamentals.market_cap, fundamentals.net_debt)
+        return cls(
+            base_fcff=base_fcff(fundamentals, assumptions.base_years),
+            risk_free_rate=risk_free_rate,
+            cost_of_debt=cost_of_debt(fundamentals, assumptions.default_cost_of_debt),
+            equity_weight=equity_weight,
+            debt_weight=debt_weight,
+            tax_rate=assumptions.tax_rate,
+            forecast_years=assumptions.forecast_years,
+            net_debt=fundamentals.net_debt,
+            shares_outstanding=fundamentals.shares_outstanding,
+            high_growth_years=assumptions.high_growth_years,
+            fade=assumptions.fade,
+        )
+
+    def value(self, fcff_growth_rate, terminal_growth_rate, beta, market_return):
+        """Fair value per share for each path; NaN where wacc <= terminal growth."""
+        ke = cost_of_equity(self.risk_free_rate, beta, market_return)
+        wacc = compute_wacc(self.equity_weight, self.debt_weight, ke, self.cost_of_debt, self.tax_rate)
+        ev = enterprise_value(self.base_fcff, fcff_growth_rate, wacc, terminal_growth_rate, self.forecast_years,
+                              self.high_growth_years, self.fade)
+        values = per_share(ev - self.net_debt, self.shares_outstanding)
+        return np.where(wacc > terminal_growth_rate, values, np.nan)
+
+
+def default_distributions(assumptions, growth_std=0.03, terminal_std=0.005, beta_std=0.15, market_std=0.01):
+    """Normal distributions centred on the point assumptions."""
+    return {
+        "fcff_growth_rate": normal(assumptions.fcff_growth_rate, growth_std),
+        "terminal_growth_rate": normal(assumptions.terminal_growth_rate, terminal_std),
+        "beta": normal(assumptions.beta, beta_std),
+        "market_return": normal(assumptions.market_return, market_std),
+    }
+
+
+def _resolve(distributions, assumptions):
+    distributions = distributions or {}
+    unknown = set(distributions) - set(SAMPLED_INPUTS)
+    if unknown:
+        raise ValueError(f"Cannot sample {sorted(unknown)}, expected a subset of {SAMPLED_INPUTS}")
+    return {name: distributions.get(name, fixed(getattr(assumptions, name))) for name in SAMPLED_INPUTS}
+
+
+@dataclass
+class MonteCarloResult:
+    values: np.ndarray
+    price: float = np.nan
+    valid: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.valid = self.values[np.isfinite(self.values)]
+
+    @property
+    def n_paths(self):
+        return len(self.values)
+
+    @property
+    def invalid_fraction(self):
+        """Share of paths whose WACC did not exceed terminal growth."""
+        return 1 - len(self.valid) / self.n_paths if self.n_paths else 0.0
+
+    def percentiles(self, q=DEFAULT_PERCENTILES):
+        return dict(zip(q, np.percentile(self.valid, q).tolist()))
+
+    def histogram(self, bins=100, range=None):
+        return np.histogram(self.valid, bins=bins, range=range)
+
+    def prob_above(self, price=None):
+        """Probability that fair value exceeds ``price`` (the market price by default)."""
+        price = self.price if price is None else price
+        return float(np.mean(self.valid > price)) if len(self.valid) else np.nan
+
+    def mean(self):
+        return float(self.valid.mean())
+
+    def std(self):
+        return float(self.valid.std())
+
+
+def _blocks(n_paths, chunk_size, seed):
+    """(start, stop, SeedSequence) per block; depends only on n_paths, chunk_size and seed."""
+    starts = range(0, n_paths, chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    return [(start, min(start + chunk_size, n_paths), ss) for start, ss in zip(starts, seeds)]
+
+
+def _standard_draws(seed_sequence, name, standard, size):
+    """Standard draws for one input of one block, from that input's child stream."""
+    child = np.random.SeedSequence(seed_sequence.entropy,
+                                   spawn_key=seed_sequence.spawn_key + (SAMPLED_INPUTS.index(name),))
+    rng = np.random.default_rng(child)
+    return rng.standard_normal(size) if standard == "normal" else rng.random(size)
+
+
+class DrawCache:
+    """Standard draws kept between runs, keyed by seed, block, input and variate.
+
+    Filling stops at ``max_bytes``; blocks past it are redrawn each run,
+    which gives the same numbers, only slower.
+    """
+
+    def __init__(self, max_bytes=128 * 2**20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._draws = {}
+        self._lock = threading.Lock()
+
+    def draws(self, seed_sequence, name, standard, size):
+        key = (seed_sequence.entropy, seed_sequence.spawn_key, name, standard, size)
+        with self._lock:
+            cached = self._draws.get(key)
+        if cached is not None:
+            return cached
+        values = _standard_draws(seed_sequence, name, standard, size)
+        with self._lock:
+            if self.nbytes + values.nbytes <= self.max_bytes and key not in self._draws:
+                self._draws[key] = values
+                self.nbytes += values.nbytes
+        return values
+
+    def clear(self):
+        with self._lock:
+            self._draws.clear()
+            self.nbytes = 0
+
+
+def _simulate_block(model, distributions, seed_sequence, size, cache=None):
+    inputs = {}
+    for name, dist in distributions.items():
+        if dist.kind == "fixed":
+            inputs[name] = dist.transform(np.empty(size))
+            continue
+        draw = cache.draws if cache is not None else _standard_draws
+        inputs[name] = dist.transform(draw(seed_sequence, name, dist.standard, size))
+    return model.value(**inputs)
+
+
+def simulate(fundamentals, assumptions, risk_free_rate, distributions=None, n_paths=100_000,
+             seed=None, chunk_size=250_000, cache=None):
+    """Value ``n_paths`` sampled scenarios and return a MonteCarloResult.
+
+    Inputs missing from ``distributions`` are held at their ``assumptions``
+    value. ``chunk_size`` bounds the number of paths in memory at once and,
+    with ``seed``, fixes the random streams. A DrawCache ``cache`` reuses the
+    standard draws of earlier runs with the same seed.
+    """
+    model = PathModel.from_inputs(fundamentals, assumptions, risk_free_rate)
+    distributions = _resolve(distributions, assumptions)
+    cache = cache if seed is not None else None  # unseeded draws never repeat
+    values = np.empty(n_paths)
+    for start, stop, ss in _blocks(n_paths, chunk_size, seed):
+        values[start:stop] = _simulate_block(model, distributions, ss, stop - start, cache)
+    return MonteCarloResult(values, price=fundamentals.price)
+
+
+def simulate_parallel(fundamentals, assumptions, risk_free_rate, distributions=None, n_paths=10_000_000,
+                      seed=None, chunk_size=250_000, workers=None):
+    """simulate() with blocks sharded across a process pool.
+
+    Returns exactly what simulate() returns for the same ``seed`` and
+    ``chunk_size``, for any ``workers`` (defaults to the CPU count).
+    """
+    model = PathModel.from_inputs(fundamentals, assumptions, risk_free_rate)
+    distributions = _resolve(distributions, assumptions)
+    blocks = _blocks(n_paths, chunk_size, seed)
+    values = np.empty(n_paths)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_simulate_block, model, distributions, ss, stop - start)
+                   for start, stop, ss in blocks]
+        for (start, stop, _), future in zip(blocks, futures):
+            values[start:stop] = future.result()
+    return MonteCarloResult(values, price=fundamentals.price)
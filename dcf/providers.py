@@ -0,0 +1,205 @@
+"""Data providers behind the cached fetch layer.
+
+A provider answers four questions: the quote-summary fields for a ticker,
+a fresh quote (market cap and share count), an annual statement frame in
+yfinance's shape (line items as rows, period ends as columns, newest
+first), and a FRED-style risk-free series. The active provider is chosen
+with DCF_PROVIDER (or set_provider()):
+
+* ``yahoo`` - Yahoo Finance and FRED, honouring DCF_PROVIDER_MODE (default);
+              remote calls are paced and retried by dcf.ratelimit
+* ``bulk``  - local warehouse extracts under DCF_BULK_DIR
+
+The bulk directory holds three Parquet or CSV files, each read once and
+indexed in memory so thousands of names value without any HTTP:
+
+* ``info``       - one row per ``ticker`` with marketCap, totalDebt, ... columns
+* ``statements`` - long format: ticker, statement, period_end, line_item, value,
+                   with statement one of financials, balance_sheet, cash_flow
+* ``rates``      - ``DATE`` plus one column per series (e.g. DGS10)
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from . import replay
+from .ratelimit import get_scheduler
+
+QUOTE_FIELDS = ("marketCap", "sharesOutstanding")
+
+
+class Provider:
+    name = "provider"
+
+    @property
+    def cache_key(self):
+        """Identifies this provider's data in the shared fetch cache."""
+        return (self.name,)
+
+    @property
+    def local(self):
+        """True when data is already on disk and needs no incremental store."""
+        return False
+
+    def info(self, ticker):
+        raise NotImplementedError
+
+    def quote(self, ticker):
+        """QUOTE_FIELDS only; projected from info() unless a lighter source exists."""
+        info = self.info(ticker)
+        return {field: info[field] for field in QUOTE_FIELDS if field in info}
+
+    def statement(self, ticker, kind):
+        raise NotImplementedError
+
+    def risk_free_series(self, series="DGS10", start=None, end=None):
+        raise NotImplementedError
+
+
+class YahooProvider(Provider):
+    name = "yahoo"
+
+    @property
+    def cache_key(self):
+        return (self.name, replay.mode())
+
+    @property
+    def local(self):
+        return replay.mode() == "replay"
+
+    def _call(self, service, func):
+        return func() if self.local else get_scheduler(service).call(func)
+
+    def info(self, ticker):
+        return self._call("yahoo", lambda: replay.make_ticker(ticker).info)
+
+    def quote(self, ticker):
+        # fast_info reads share-count and price history instead of the full
+        # quote summary; recorded fixtures only hold info, so other modes project that
+        if replay.mode() != "live":
+            return super().quote(ticker)
+
+        def fetch():
+            fast = replay.make_ticker(ticker).fast_info
+            shares, price = fast["shares"], fast["lastPrice"]
+            # fast_info["marketCap"] would quietly load the full info here; do it visibly
+            if shares is None or price is None:
+                return None
+            return {"marketCap": shares * price, "sharesOutstanding": shares}
+        return self._call("yahoo", fetch) or super().quote(ticker)
+
+    def statement(self, ticker, kind):
+        return self._call("yahoo", lambda: getattr(replay.make_ticker(ticker), kind))
+
+    def risk_free_series(self, series="DGS10", start=None, end=None):
+        return self._call("fred", lambda: replay.datareader(series, "fred", start=start, end=end))
+
+
+def long_to_statement(rows):
+    """yfinance-shaped frame from long rows of line_item, period_end, value."""
+    # Scatter into a dense array; pivot_table costs milliseconds per call at this size
+    item_codes, items = pd.factorize(rows["line_item"])
+    period_codes, periods = pd.factorize(pd.to_datetime(rows["period_end"]))
+    values = np.full((len(items), len(periods)), np.nan)
+    values[item_codes, period_codes] = rows["value"].to_numpy(dtype=float)
+    order = np.argsort(periods)[::-1]
+    return pd.DataFrame(values[:, order], index=list(items), columns=pd.DatetimeIndex(periods[order]))
+
+
+def statement_to_long(frame):
+    """Inverse of long_to_statement, dropping missing values."""
+    rows = frame.rename_axis(index="line_item", columns="period_end").stack().rename("value").reset_index()
+    rows["period_end"] = pd.to_datetime(rows["period_end"])
+    return rows.dropna(subset=["value"])
+
+
+def _read_table(root, stem):
+    for suffix, reader in ((".parquet", pd.read_parquet), (".csv", pd.read_csv)):
+        path = os.path.join(root, stem + suffix)
+        if os.path.exists(path):
+            return reader(path)
+    raise FileNotFoundError(f"No {stem}.parquet or {stem}.csv in {root}")
+
+
+class BulkFileProvider(Provider):
+    name = "bulk"
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._info = None
+        self._statements = None
+        self._rates = None
+
+    @property
+    def cache_key(self):
+        return (self.name, self.root)
+
+    @property
+    def local(self):
+        return True
+
+    def _load(self):
+        with self._lock:
+            if self._info is not None:
+                return
+            info = _read_table(self.root, "info")
+            info["ticker"] = info["ticker"].str.upper()
+            statements = _read_table(self.root, "statements")
+            statements["ticker"] = statements["ticker"].str.upper()
+            statements["period_end"] = pd.to_datetime(statements["period_end"])
+            self._statements = {key: group for key, group in statements.groupby(["ticker", "statement"])}
+            self._info = info.set_index("ticker")
+
+    def info(self, ticker):
+        self._load()
+        if ticker not in self._info.index:
+            raise KeyError(f"{ticker} not found in {self.root} info")
+        row = self._info.loc[ticker]
+        return {field: value for field, value in row.items() if pd.notna(value)}
+
+    def statement(self, ticker, kind):
+        self._load()
+        rows = self._statements.get((ticker, kind))
+        if rows is None:
+            raise KeyError(f"No {kind} for {ticker} in {self.root} statements")
+        return long_to_statement(rows)
+
+    def risk_free_series(self, series="DGS10", start=None, end=None):
+        with self._lock:
+            if self._rates is None:
+                rates = _read_table(self.root, "rates")
+                self._rates = rates.set_index(pd.to_datetime(rates.pop("DATE"))).sort_index()
+        frame = self._rates[[series]]
+        return frame.loc[pd.Timestamp(start) if start is not None else None:
+                         pd.Timestamp(end) if end is not None else None]
+
+
+def provider_from_env():
+    name = os.environ.get("DCF_PROVIDER", "yahoo")
+    if name == "yahoo":
+        return YahooProvider()
+    if name == "bulk":
+        root = os.environ.get("DCF_BULK_DIR")
+        if not root:
+            raise ValueError("DCF_PROVIDER=bulk needs DCF_BULK_DIR")
+        return BulkFileProvider(root)
+    raise ValueError(f"Unknown provider {name!r}, expected 'yahoo' or 'bulk'")
+
+
+_provider = None
+
+
+def get_provider():
+    global _provider
+    if _provider is None:
+        _provider = provider_from_env()
+    return _provider
+
+
+def set_provider(provider):
+    """Use ``provider`` for all fetches in this process."""
+    global _provider
+    _provider = provider
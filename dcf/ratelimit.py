@@ -0,0 +1,194 @@
+"""Pacing and retries for remote provider calls.
+
+Each upstream service (``yahoo``, ``fred``) gets one Scheduler per process:
+a token bucket that holds calls to a steady rate, plus retries with full
+jittered exponential backoff for transient failures (throttling, timeouts,
+dropped connections). Rates are requests per second, set with
+DCF_RATE_LIMIT, e.g. ``yahoo=2,fred=1``; batch runs divide their budget
+across worker processes.
+
+Scheduler.stats() reports how many calls are queued for a token and how
+long calls have waited, which is what to watch when tuning a large run.
+Code that times a call can register on_token() to learn when the call is
+queued and when it actually goes out, so time spent waiting is not counted.
+"""
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_RATES = {"yahoo": 2.0, "fred": 1.0}
+
+# Exception classes (matched by name anywhere in the MRO, so yfinance and
+# requests need not be imported or be a particular version) worth retrying
+TRANSIENT_ERRORS = frozenset({
+    "YFRateLimitError",  # yfinance: HTTP 429 from Yahoo
+    "Timeout",  # requests: ConnectTimeout, ReadTimeout
+    "ConnectionError",  # requests and builtin
+    "ChunkedEncodingError",  # requests: connection dropped mid-body
+    "ProtocolError",  # urllib3
+    "TimeoutError",
+})
+
+
+def _status_code(exc):
+    """HTTP status of a failed response (requests' HTTPError and the like), else None."""
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_transient(exc):
+    """True for throttling, server errors, timeouts and dropped connections; never for missing data."""
+    status = _status_code(exc)
+    if status is not None:
+        return status == 429 or status >= 500
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(exc).__mro__)
+
+
+_local = threading.local()
+
+
+@contextmanager
+def on_token(callback):
+    """Report this thread's Scheduler waits within the block to ``callback(granted)``.
+
+    ``granted`` is False when a call starts waiting (for a token or a retry
+    backoff) and True when its token is granted and the request goes out.
+    """
+    previous = getattr(_local, "on_token", None)
+    _local.on_token = callback
+    try:
+        yield
+    finally:
+        _local.on_token = previous
+
+
+def _notify(granted):
+    callback = getattr(_local, "on_token", None)
+    if callback is not None:
+        callback(granted)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` per second up to ``burst``.
+
+    acquire() reserves a token and sleeps off any shortfall outside the
+    lock, so callers are served in arrival order.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waiting = 0
+
+    def acquire(self):
+        """Take one token, blocking until it is available; returns the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            if wait:
+                self.waiting += 1
+        if wait:
+            time.sleep(wait)
+            with self._lock:
+                self.waiting -= 1
+        return wait
+
+
+class Scheduler:
+    def __init__(self, name, rate, burst=None, retries=3, backoff=0.5, max_backoff=8.0):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._random = random.Random()
+        self.requests = 0
+        self.retried = 0
+        self.failures = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _waited(self, seconds):
+        with self._lock:
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def call(self, func):
+        """Run ``func()`` at the scheduler's rate, retrying transient failures.
+
+        The calling thread's on_token() callback hears when each attempt
+        starts waiting and when it gets its token.
+        """
+        for attempt in range(self.retries + 1):
+            _notify(False)
+            self._waited(self.bucket.acquire())
+            with self._lock:
+                self.requests += 1
+            _notify(True)
+            try:
+                return func()
+            except Exception as e:
+                if attempt == self.retries or not is_transient(e):
+                    with self._lock:
+                        self.failures += 1
+                    raise
+                delay = self._random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                with self._lock:
+                    self.retried += 1
+                self._waited(delay)
+                _notify(False)
+                time.sleep(delay)
+
+    def stats(self):
+        """Queue depth and wait times so far, for progress logs."""
+        with self._lock:
+            return {
+                "service": self.name,
+                "rate": self.bucket.rate,
+                "queue_depth": self.bucket.waiting,
+                "requests": self.requests,
+                "retries": self.retried,
+                "failures": self.failures,
+                "total_wait": self.total_wait,
+                "mean_wait": self.total_wait / self.requests if self.requests else 0.0,
+                "max_wait": self.max_wait,
+            }
+
+
+def parse_rates(spec):
+    """``"yahoo=2,fred=1"`` -> ``{"yahoo": 2.0, "fred": 1.0}`` over DEFAULT_RATES."""
+    rates = dict(DEFAULT_RATES)
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        name, _, rate = part.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(service):
+    """The process-wide Scheduler for ``service``, paced per DCF_RATE_LIMIT."""
+    with _schedulers_lock:
+        if service not in _schedulers:
+            rate = parse_rates(os.environ.get("DCF_RATE_LIMIT"))[service]
+            _schedulers[service] = Scheduler(service, rate)
+        return _schedulers[service]
+
+
+def scheduler_stats():
+    """stats() of every scheduler created in this process."""
+    with _schedulers_lock:
+        schedulers = list(_schedulers.values())
+    return {s.name: s.stats() for s in schedulers}
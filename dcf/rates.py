@@ -0,0 +1,91 @@
+"""Risk-free rate from FRED, kept on disk and topped up incrementally.
+
+The full DGS10 history is only downloaded once. Later calls fetch just the
+days after the last stored observation, and at most once per
+``refresh_interval`` seconds; in between, the latest value is served from
+memory.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from . import replay
+from .cache import DATA_DIR
+from .providers import get_provider
+
+
+class RiskFreeRateStore:
+    def __init__(self, series="DGS10", path=None, start="2023-01-01", refresh_interval=3600):
+        self.series = series
+        self.path = path or os.path.join(DATA_DIR, f"fred_{series}.csv")
+        self.start = pd.Timestamp(start)
+        self.refresh_interval = refresh_interval
+        self._data = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            data = pd.read_csv(self.path, index_col=0, parse_dates=True)
+        else:
+            data = pd.DataFrame(columns=[self.series], dtype=float)
+        data.index.name = "DATE"
+        return data
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        self._data.to_csv(tmp, index_label="DATE")
+        os.replace(tmp, self.path)
+
+    def _fetch(self, start, end):
+        return get_provider().risk_free_series(self.series, start=start, end=end)
+
+    def refresh(self, force=False):
+        """Append observations newer than the last stored date."""
+        with self._lock:
+            if self._data is None:
+                self._data = self._load()
+            now = time.monotonic()
+            if not force and self._checked_at is not None and now - self._checked_at < self.refresh_interval:
+                return self._data
+            today = pd.Timestamp(datetime.today().date())
+            start = self._data.index.max() + timedelta(days=1) if len(self._data) else self.start
+            if start <= today:
+                new = self._fetch(start, today)
+                new = new[new.index >= start]
+                if len(new):
+                    self._data = pd.concat([self._data, new[[self.series]]]).sort_index()
+                    self._data = self._data[~self._data.index.duplicated(keep="last")]
+                    self._save()
+            self._checked_at = now
+            return self._data
+
+    def series_data(self):
+        return self.refresh()[self.series]
+
+    def latest(self):
+        """Most recent non-missing observation, in percent."""
+        observed = self.series_data().dropna()
+        if observed.empty:
+            raise ValueError(f"No {self.series} observations available from FRED")
+        return float(observed.iloc[-1])
+
+
+_default_store = RiskFreeRateStore()
+
+
+def get_risk_free_rate():
+    """Latest 10-year Treasury yield as a decimal."""
+    provider = get_provider()
+    if provider.local:
+        # Already on disk (fixtures, bulk extracts); the incremental store adds nothing
+        return provider.risk_free_series("DGS10").dropna().iloc[-1, 0] / 100
+    if replay.mode() == "record":
+        # Fetch the whole series so the fixture holds it, not just days the store lacks
+        series = provider.risk_free_series("DGS10", start=_default_store.start, end=pd.Timestamp.today())
+        return series.dropna().iloc[-1, 0] / 100
+    return _default_store.latest() / 100
@@ -0,0 +1,192 @@
+"""Record live provider responses to disk and replay them offline.
+
+The provider mode is taken from DCF_PROVIDER_MODE (or set_mode()):
+
+* ``live``   - call Yahoo Finance and FRED directly (default)
+* ``record`` - call them and save every response to the fixture store
+* ``replay`` - serve only from the fixture store, never touching the network
+
+Fixtures live under DCF_FIXTURE_DIR as ``<TICKER>/info.json`` and one pickle
+per statement frame, plus ``fred/<SERIES>.csv``. RecordingTicker and
+ReplayTicker expose the same attributes the model reads from yf.Ticker, and
+recording_datareader / replay_datareader share web.DataReader's signature,
+so everything above them runs unchanged and benchmarks become repeatable.
+
+    python -m dcf.replay MSFT AAPL    # record fixtures for these tickers
+"""
+import json
+import os
+import sys
+
+import pandas as pd
+import pandas_datareader.data as web
+import yfinance as yf
+
+from .cache import DATA_DIR
+
+MODES = ("live", "record", "replay")
+FIXTURE_DIR = os.environ.get("DCF_FIXTURE_DIR", os.path.join(DATA_DIR, "fixtures"))
+STATEMENTS = ("financials", "balance_sheet", "cash_flow")
+
+_mode = os.environ.get("DCF_PROVIDER_MODE", "live")
+
+
+def mode():
+    return _mode
+
+
+def set_mode(new_mode):
+    """Switch provider mode for this process (worker processes read the env var)."""
+    global _mode
+    if new_mode not in MODES:
+        raise ValueError(f"Unknown provider mode {new_mode!r}, expected one of {MODES}")
+    _mode = new_mode
+
+
+class FixtureStore:
+    def __init__(self, root=None):
+        self.root = root or FIXTURE_DIR
+
+    def _path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def _require(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No fixture at {path}; record it first with `python -m dcf.replay`")
+        return path
+
+    def _write(self, path, write):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        write(tmp)
+        os.replace(tmp, path)
+
+    def save_info(self, ticker, info):
+        def write(tmp):
+            with open(tmp, "w") as fh:
+                json.dump(info, fh, default=str)
+        self._write(self._path(ticker, "info.json"), write)
+
+    def load_info(self, ticker):
+        with open(self._require(self._path(ticker, "info.json"))) as fh:
+            return json.load(fh)
+
+    def save_statement(self, ticker, kind, frame):
+        self._write(self._path(ticker, f"{kind}.pkl"), frame.to_pickle)
+
+    def load_statement(self, ticker, kind):
+        return pd.read_pickle(self._require(self._path(ticker, f"{kind}.pkl")))
+
+    def save_series(self, name, frame):
+        """Merge ``frame`` into the stored series, keeping the newest value per date."""
+        path = self._path("fred", f"{name}.csv")
+        if os.path.exists(path):
+            frame = pd.concat([self.load_series(name), frame])
+            frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+        self._write(path, lambda tmp: frame.to_csv(tmp, index_label="DATE"))
+
+    def load_series(self, name):
+        return pd.read_csv(self._require(self._path("fred", f"{name}.csv")), index_col=0, parse_dates=True)
+
+
+class ReplayTicker:
+    """Stand-in for yf.Ticker that serves recorded fixtures."""
+
+    def __init__(self, ticker, store=None):
+        self.ticker = ticker
+        self._store = store or FixtureStore()
+
+    @property
+    def info(self):
+        return self._store.load_info(self.ticker)
+
+    @property
+    def financials(self):
+        return self._store.load_statement(self.ticker, "financials")
+
+    @property
+    def balance_sheet(self):
+        return self._store.load_statement(self.ticker, "balance_sheet")
+
+    @property
+    def cash_flow(self):
+        return self._store.load_statement(self.ticker, "cash_flow")
+
+
+class RecordingTicker:
+    """yf.Ticker wrapper that saves each response it returns."""
+
+    def __init__(self, ticker, store=None):
+        self.ticker = ticker
+        self._live = yf.Ticker(ticker)
+        self._store = store or FixtureStore()
+
+    @property
+    def info(self):
+        info = self._live.info
+        self._store.save_info(self.ticker, info)
+        return info
+
+    def _statement(self, kind):
+        frame = getattr(self._live, kind)
+        self._store.save_statement(self.ticker, kind, frame)
+        return frame
+
+    @property
+    def financials(self):
+        return self._statement("financials")
+
+    @property
+    def balance_sheet(self):
+        return self._statement("balance_sheet")
+
+    @property
+    def cash_flow(self):
+        return self._statement("cash_flow")
+
+
+def replay_datareader(name, data_source=None, start=None, end=None, store=None):
+    """web.DataReader over the recorded series, sliced to [start, end]."""
+    frame = (store or FixtureStore()).load_series(name)
+    return frame.loc[pd.Timestamp(start) if start is not None else None:
+                     pd.Timestamp(end) if end is not None else None]
+
+
+def recording_datareader(name, data_source=None, start=None, end=None, store=None):
+    frame = web.DataReader(name, data_source, start=start, end=end)
+    (store or FixtureStore()).save_series(name, frame)
+    return frame
+
+
+def make_ticker(ticker):
+    """yf.Ticker, RecordingTicker or ReplayTicker depending on the mode."""
+    if _mode == "replay":
+        return ReplayTicker(ticker)
+    if _mode == "record":
+        return RecordingTicker(ticker)
+    return yf.Ticker(ticker)
+
+
+def datareader(name, data_source=None, start=None, end=None):
+    """web.DataReader routed through the current mode."""
+    if _mode == "replay":
+        return replay_datareader(name, data_source, start=start, end=end)
+    if _mode == "record":
+        return recording_datareader(name, data_source, start=start, end=end)
+    return web.DataReader(name, data_source, start=start, end=end)
+
+
+def record(tickers, series=("DGS10",), start="2023-01-01", store=None):
+    """Fetch and save fixtures for ``tickers`` and the FRED ``series``."""
+    store = store or FixtureStore()
+    for name in series:
+        recording_datareader(name, "fred", start=start, end=pd.Timestamp.today(), store=store)
+    for ticker in tickers:
+        live = RecordingTicker(ticker.upper(), store)
+        live.info
+        for kind in STATEMENTS:
+            getattr(live, kind)
+
+
+if __name__ == "__main__":
+    record(sys.argv[1:])
@@ -0,0 +1,89 @@
+"""Named assumption sets per ticker, compared side by side in one batch.
+
+Scenarios are kept in a JSON book (DATA_DIR/scenarios.json by default) as
+``{ticker: {name: {assumption field: value}}}``. Comparing them never
+refetches: every scenario for a ticker is valued by a single
+value_scenarios call over fundamentals that are already loaded, so adding
+one costs a row in an array expression.
+"""
+import json
+import os
+import threading
+from dataclasses import asdict, replace
+
+import pandas as pd
+
+from .cache import DATA_DIR
+from .valuation import Assumptions, assumptions_frame, value_scenarios
+
+
+def default_scenarios(assumptions, growth_step=0.04, beta_step=0.2):
+    """Bear, base and bull cases around ``assumptions``."""
+    return {
+        "bear": replace(assumptions, fcff_growth_rate=assumptions.fcff_growth_rate - growth_step,
+                        beta=assumptions.beta + beta_step),
+        "base": assumptions,
+        "bull": replace(assumptions, fcff_growth_rate=assumptions.fcff_growth_rate + growth_step,
+                        beta=max(0.0, assumptions.beta - beta_step)),
+    }
+
+
+class ScenarioBook:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DATA_DIR, "scenarios.json")
+        self._lock = threading.Lock()
+        self._book = None
+
+    def _load(self):
+        if self._book is None:
+            if os.path.exists(self.path):
+                with open(self.path) as fh:
+                    self._book = json.load(fh)
+            else:
+                self._book = {}
+        return self._book
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(self._book, fh, indent=2)
+        os.replace(tmp, self.path)
+
+    def scenarios(self, ticker):
+        """{name: Assumptions} saved for ``ticker``, in insertion order."""
+        with self._lock:
+            saved = self._load().get(ticker.upper(), {})
+            return {name: Assumptions(**fields) for name, fields in saved.items()}
+
+    def save(self, ticker, name, assumptions):
+        with self._lock:
+            self._load().setdefault(ticker.upper(), {})[name] = asdict(assumptions)
+            self._save()
+
+    def delete(self, ticker, name):
+        with self._lock:
+            saved = self._load().get(ticker.upper(), {})
+            if saved.pop(name, None) is not None:
+                self._save()
+
+
+def compare_scenarios(fundamentals, risk_free_rate, scenarios):
+    """Side-by-side table of ``scenarios`` ({name: Assumptions}), one column each.
+
+    Rows are the assumption fields followed by fair value per share and
+    upside to the current price; all columns are valued in one batch.
+    """
+    frame = assumptions_frame(scenarios.values())
+    values = value_scenarios(fundamentals, risk_free_rate, frame)
+    table = frame.assign(fair_value_per_share=values, upside=values / fundamentals.price - 1)
+    table.index = pd.Index(list(scenarios), name="scenario")
+    return table.T
+
+
+_default_book = ScenarioBook()
+
+
+def get_scenario_book():
+    """The process-wide book under DATA_DIR."""
+    return _default_book
@@ -0,0 +1,94 @@
+"""WACC x terminal-growth sensitivity computed as one broadcast, and tornado swings.
+
+Every cell is an O(1) closed-form valuation (see valuation.enterprise_value),
+so the grid costs one array expression however long the forecast period is;
+a multi-stage fade adds one cumulative product over the fade years.
+Cells where WACC does not exceed growth have no Gordon value and come back
+as NaN.
+"""
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+from .valuation import assumptions_frame, enterprise_value, per_share, value_scenarios
+
+MAX_AXIS_POINTS = 1000
+
+# Default +/- step for each tornado driver, in the units of its Assumptions field
+TORNADO_FLEX = {
+    "beta": 0.2,
+    "market_return": 0.01,
+    "fcff_growth_rate": 0.02,
+    "terminal_growth_rate": 0.005,
+    "forecast_years": 2,
+    "tax_rate": 0.05,
+    "base_years": 1,
+}
+
+
+def sensitivity_axis(low, high, points):
+    """Evenly spaced axis from ``low`` to ``high`` inclusive."""
+    if not 1 <= points <= MAX_AXIS_POINTS:
+        raise ValueError(f"points must be between 1 and {MAX_AXIS_POINTS}, got {points}")
+    return np.linspace(low, high, points)
+
+
+def sensitivity_grid(base_fcff, fcff_growth_rate, forecast_years, net_debt, shares_outstanding,
+                     wacc_range, g_range, high_growth_years=None, fade="linear"):
+    """Fair value per share for every (wacc, g) pair, shape (len(wacc), len(g))."""
+    w = np.asarray(wacc_range, dtype=float)[:, None]
+    g = np.asarray(g_range, dtype=float)[None, :]
+    ev = enterprise_value(base_fcff, fcff_growth_rate, w, g, forecast_years, high_growth_years, fade)
+    grid = per_share(ev - net_debt, shares_outstanding)
+    grid[w <= g] = np.nan
+    return grid
+
+
+def label_grid(grid, wacc_range, g_range):
+    """Frame over ``grid`` with percentage labels on both axes."""
+    return pd.DataFrame(grid,
+                        index=[f"{round(w*100,1)}%" for w in wacc_range],
+                        columns=[f"{round(g*100,1)}%" for g in g_range])
+
+
+def sensitivity_table(result, fundamentals, wacc_range, g_range):
+    """sensitivity_grid for a DCFResult, labelled with percentage axes."""
+    a = result.assumptions
+    grid = sensitivity_grid(result.base_fcff, a.fcff_growth_rate, a.forecast_years, fundamentals.net_debt,
+                            fundamentals.shares_outstanding, wacc_range, g_range, a.high_growth_years, a.fade)
+    return label_grid(grid, wacc_range, g_range)
+
+
+def _flexed(value, step, sign):
+    if isinstance(value, int):
+        return max(1, value + sign * int(step))
+    return value + sign * step
+
+
+def tornado(fundamentals, assumptions, risk_free_rate, flex=None, scale=1.0):
+    """Fair value swing from flexing each driver down and up one at a time.
+
+    ``flex`` maps Assumptions fields to their step (TORNADO_FLEX by default);
+    ``scale`` multiplies every float step. The base case and both legs of
+    every driver are valued in a single value_scenarios batch. Returns a
+    frame indexed by driver, widest swing first, with the flexed inputs, the
+    low/high fair values and their swing.
+    """
+    flex = {name: step * scale if isinstance(step, float) else step
+            for name, step in (flex or TORNADO_FLEX).items()}
+    rows = [assumptions]
+    for name, step in flex.items():
+        value = getattr(assumptions, name)
+        rows += [replace(assumptions, **{name: _flexed(value, step, -1)}),
+                 replace(assumptions, **{name: _flexed(value, step, +1)})]
+    values = value_scenarios(fundamentals, risk_free_rate, assumptions_frame(rows))
+    low, high = values[1::2], values[2::2]
+    table = pd.DataFrame({
+        "low_input": [getattr(a, name) for a, name in zip(rows[1::2], flex)],
+        "high_input": [getattr(a, name) for a, name in zip(rows[2::2], flex)],
+        "low_value": low,
+        "high_value": high,
+        "swing": np.abs(high - low),
+    }, index=pd.Index(list(flex), name="driver"))
+    return table.sort_values("swing", ascending=False)
@@ -0,0 +1,123 @@
+"""Annual statements kept on disk and topped up one fiscal period at a time.
+
+Statements are stored in SQLite (DATA_DIR/fundamentals.sqlite by default)
+as long rows keyed by ticker, statement, fiscal period end and line item,
+so app restarts and batch runs reuse every stored year. A new annual period
+cannot appear before the next period end, a year after the latest stored
+one, so until then the provider is not called at all. From then on it is
+asked at most once per ``refresh_interval`` (filings land some weeks after
+period end) and only periods newer than the stored ones are appended.
+"""
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+from .cache import DATA_DIR
+from .providers import get_provider, long_to_statement, statement_to_long
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS statements (
+    ticker TEXT NOT NULL,
+    statement TEXT NOT NULL,
+    period_end TEXT NOT NULL,
+    line_item TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (ticker, statement, period_end, line_item)
+);
+CREATE TABLE IF NOT EXISTS checks (
+    ticker TEXT NOT NULL,
+    statement TEXT NOT NULL,
+    checked_at REAL NOT NULL,
+    PRIMARY KEY (ticker, statement)
+);
+"""
+
+
+class FundamentalsStore:
+    def __init__(self, path=None, refresh_interval=86400):
+        self.path = path or os.path.join(DATA_DIR, "fundamentals.sqlite")
+        self.refresh_interval = refresh_interval
+        self._ready = False
+
+    @contextmanager
+    def _connect(self):
+        if not self._ready:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            if not self._ready:
+                conn.execute("PRAGMA journal_mode=WAL")  # batch workers read while one writes
+                conn.executescript(_SCHEMA)
+                self._ready = True
+            with conn:  # commit on success, roll back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def _fetch(self, ticker, kind):
+        return get_provider().statement(ticker, kind)
+
+    def _rows(self, conn, ticker, kind):
+        return pd.read_sql_query(
+            "SELECT line_item, period_end, value FROM statements WHERE ticker = ? AND statement = ? ORDER BY rowid",
+            conn, params=(ticker, kind), parse_dates=["period_end"])
+
+    def _due(self, conn, ticker, kind, latest):
+        """True when a period newer than ``latest`` may have ended and was not checked recently."""
+        if latest is not None and pd.Timestamp.today() < latest + pd.DateOffset(years=1):
+            return False
+        checked = conn.execute("SELECT checked_at FROM checks WHERE ticker = ? AND statement = ?",
+                               (ticker, kind)).fetchone()
+        return checked is None or time.time() - checked[0] >= self.refresh_interval
+
+    def refresh(self, ticker, kind, force=False):
+        """Append any periods newer than the stored ones; returns the number appended."""
+        with self._connect() as conn:
+            latest = conn.execute("SELECT MAX(period_end) FROM statements WHERE ticker = ? AND statement = ?",
+                                  (ticker, kind)).fetchone()[0]
+            latest = None if latest is None else pd.Timestamp(latest)
+            if not force and not self._due(conn, ticker, kind, latest):
+                return 0
+        # Fetched outside any transaction so slow providers never hold the database
+        rows = statement_to_long(self._fetch(ticker, kind))
+        if rows.empty and latest is None:
+            return 0  # yfinance returns empty frames when throttled; ask again next time
+        if latest is not None:
+            rows = rows[rows["period_end"] > latest]
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO statements VALUES (?, ?, ?, ?, ?)",
+                [(ticker, kind, period.isoformat(), str(item), float(value))
+                 for item, period, value in rows[["line_item", "period_end", "value"]].itertuples(index=False)])
+            conn.execute("INSERT OR REPLACE INTO checks VALUES (?, ?, ?)", (ticker, kind, time.time()))
+            return rows["period_end"].nunique()
+
+    def statement(self, ticker, kind):
+        """Stored statement frame in yfinance's shape, refreshed first if a period is due.
+
+        Raises LookupError when nothing is stored and the provider returned
+        no rows, so an empty response is never cached upstream.
+        """
+        self.refresh(ticker, kind)
+        with self._connect() as conn:
+            rows = self._rows(conn, ticker, kind)
+        if rows.empty:
+            raise LookupError(f"No {kind} rows for {ticker} from the provider")
+        return long_to_statement(rows)
+
+    def periods(self, ticker, kind):
+        """Stored fiscal period ends, oldest first."""
+        with self._connect() as conn:
+            found = conn.execute("SELECT DISTINCT period_end FROM statements WHERE ticker = ? AND statement = ? "
+                                 "ORDER BY period_end", (ticker, kind)).fetchall()
+        return [pd.Timestamp(period) for (period,) in found]
+
+
+_default_store = FundamentalsStore()
+
+
+def get_fundamentals_store():
+    return _default_store
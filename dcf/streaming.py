@@ -0,0 +1,192 @@
+"""Monte Carlo statistics accumulated block by block in constant memory.
+
+simulate_streaming() values the same seeded blocks as montecarlo.simulate()
+but never keeps the paths: each block is folded into a MonteCarloSummary of
+running moments, a fixed-edge histogram, the count above the market price
+and a t-digest for quantiles, then dropped. Memory is set by the chunk size
+and the digest's compression, not by the path count, so 10^8 paths fit on a
+small worker.
+
+Summaries merge, and per-block summaries are always merged in block order,
+so a seed gives the same statistics serially or across any number of
+workers.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .montecarlo import DEFAULT_PERCENTILES, PathModel, _blocks, _resolve, _simulate_block
+
+
+class TDigest:
+    """Merging t-digest with the arcsine (k1) scale function.
+
+    Values and centroids are merged in one sorted pass: each centroid covers
+    at most one unit of k = compression / (2 pi) * arcsin(2q - 1), which keeps
+    tail centroids small, so extreme quantiles stay accurate while at most
+    about compression / 2 centroids are kept.
+    """
+
+    def __init__(self, compression=500):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        if values.size:
+            self.min = min(self.min, values.min())
+            self.max = max(self.max, values.max())
+            self._compress(values, np.ones(values.size))
+
+    def merge(self, other):
+        if other.weights.size:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress(other.means, other.weights)
+
+    def _compress(self, means, weights):
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+        starts = np.flatnonzero(np.diff(k, prepend=np.nan))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q):
+        """Approximate quantiles for ``q`` in [0, 1]; NaN when empty."""
+        if not self.weights.size:
+            return np.full(np.shape(q), np.nan)
+        total = self.weights.sum()
+        centres = np.cumsum(self.weights) - self.weights / 2
+        return np.interp(np.asarray(q, dtype=float) * total,
+                         np.concatenate([[0], centres, [total]]),
+                         np.concatenate([[self.min], self.means, [self.max]]))
+
+
+class MonteCarloSummary:
+    """Streaming stand-in for MonteCarloResult with the same read methods.
+
+    ``price`` is fixed up front so prob_above() is an exact count; the
+    histogram has fixed ``edges`` with out-of-range paths counted in
+    ``underflow`` and ``overflow``.
+    """
+
+    def __init__(self, price=np.nan, edges=None, compression=500):
+        self.price = price
+        self.edges = None if edges is None else np.asarray(edges, dtype=float)
+        self.counts = None if edges is None else np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.n_paths = 0
+        self.n_valid = 0
+        self.n_above = 0
+        self._mean = 0.0
+        self._m2 = 0.0  # sum of squared deviations from the mean
+        self.digest = TDigest(compression)
+
+    def update(self, values):
+        """Fold one block of path values (NaN for invalid paths) into the summary."""
+        values = np.asarray(values, dtype=float)
+        valid = values[np.isfinite(values)]
+        block = MonteCarloSummary(self.price, self.edges, self.digest.compression)
+        block.n_paths = values.size
+        block.n_valid = valid.size
+        block.n_above = int(np.count_nonzero(valid > self.price))
+        if valid.size:
+            block._mean = float(valid.mean())
+            block._m2 = float(((valid - block._mean) ** 2).sum())
+        if self.edges is not None:
+            block.counts = np.histogram(valid, bins=self.edges)[0]
+            block.underflow = int(np.count_nonzero(valid < self.edges[0]))
+            block.overflow = int(np.count_nonzero(valid > self.edges[-1]))
+        block.digest.update(valid)
+        self.merge(block)
+
+    def merge(self, other):
+        """Combine with another summary over disjoint paths (same price and edges)."""
+        n = self.n_valid + other.n_valid
+        if n:
+            delta = other._mean - self._mean
+            self._m2 += other._m2 + delta ** 2 * self.n_valid * other.n_valid / n
+            self._mean += delta * other.n_valid / n
+        self.n_paths += other.n_paths
+        self.n_valid = n
+        self.n_above += other.n_above
+        if self.counts is not None:
+            self.counts += other.counts
+            self.underflow += other.underflow
+            self.overflow += other.overflow
+        self.digest.merge(other.digest)
+
+    @property
+    def invalid_fraction(self):
+        """Share of paths whose WACC did not exceed terminal growth."""
+        return 1 - self.n_valid / self.n_paths if self.n_paths else 0.0
+
+    def percentiles(self, q=DEFAULT_PERCENTILES):
+        return dict(zip(q, self.digest.quantile(np.asarray(q) / 100).tolist()))
+
+    def histogram(self):
+        """(counts, edges) over the fixed edges, like np.histogram."""
+        return self.counts, self.edges
+
+    def prob_above(self):
+        """Probability that fair value exceeds the market price."""
+        return self.n_above / self.n_valid if self.n_valid else np.nan
+
+    def mean(self):
+        return self._mean if self.n_valid else np.nan
+
+    def std(self):
+        return float(np.sqrt(self._m2 / self.n_valid)) if self.n_valid else np.nan
+
+
+def _summarize_block(model, distributions, seed_sequence, size, price, edges, compression, cache=None):
+    summary = MonteCarloSummary(price, edges, compression)
+    summary.update(_simulate_block(model, distributions, seed_sequence, size, cache))
+    return summary
+
+
+def simulate_streaming(fundamentals, assumptions, risk_free_rate, distributions=None, n_paths=100_000_000,
+                       seed=None, chunk_size=250_000, workers=1, bins=100, hist_range=None, compression=500,
+                       cache=None):
+    """Monte Carlo over ``n_paths`` returning a MonteCarloSummary instead of the paths.
+
+    Draws the same blocks as simulate() for a given ``seed`` and
+    ``chunk_size``. The histogram spans ``hist_range``, by default the
+    1st-99th percentile of the first block. ``workers`` > 1 shards blocks
+    across a process pool; the result does not depend on it. A DrawCache
+    ``cache`` reuses standard draws between serial runs.
+    """
+    model = PathModel.from_inputs(fundamentals, assumptions, risk_free_rate)
+    distributions = _resolve(distributions, assumptions)
+    cache = cache if seed is not None else None  # unseeded draws never repeat
+    blocks = _blocks(n_paths, chunk_size, seed)
+    price = fundamentals.price
+
+    start, stop, ss = blocks[0]
+    first = _simulate_block(model, distributions, ss, stop - start, cache)
+    if hist_range is None:
+        valid = first[np.isfinite(first)]
+        hist_range = tuple(np.percentile(valid, [1, 99])) if valid.size else (0.0, 1.0)
+    edges = np.linspace(*hist_range, bins + 1)
+    total = MonteCarloSummary(price, edges, compression)
+    total.update(first)
+    del first
+
+    rest = [(model, distributions, ss, stop - start, price, edges, compression) for start, stop, ss in blocks[1:]]
+    if workers == 1:
+        for args in rest:
+            total.merge(_summarize_block(*args, cache))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for summary in pool.map(_summarize_block, *zip(*rest)) if rest else ():
+                total.merge(summary)
+    return total
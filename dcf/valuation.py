@@ -0,0 +1,441 @@
+"""Headless DCF engine.
+
+Everything the Streamlit page computes from fetched data lives here as plain
+functions over normalized inputs, so the same engine can be imported,
+benchmarked and run in batch jobs. Monetary amounts are in billions except
+``shares_outstanding`` and per-share values.
+"""
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+FCFF_COLUMN = "Free Cash Flow To The Firm"
+
+
+@dataclass(frozen=True)
+class Fundamentals:
+    ticker: str
+    fcff_history: pd.DataFrame
+    market_cap: float
+    total_debt: float
+    cash: float
+    interest_expense: float
+    shares_outstanding: float
+
+    @property
+    def net_debt(self):
+        return self.total_debt - self.cash
+
+    @property
+    def price(self):
+        """Market price per share implied by market cap."""
+        return self.market_cap * 1e9 / self.shares_outstanding
+
+    @property
+    def last_year(self):
+        return pd.to_datetime(self.fcff_history.index[-1]).year
+
+
+@dataclass(frozen=True)
+class Assumptions:
+    forecast_years: int = 10
+    fcff_growth_rate: float = 0.14
+    terminal_growth_rate: float = 0.05
+    beta: float = 1.0
+    market_return: float = 0.09
+    tax_rate: float = 0.21
+    base_years: int = 3
+    default_cost_of_debt: float = 0.02  # used when there is no debt to infer it from
+    # Multi-stage growth: fcff_growth_rate for the first high_growth_years, then
+    # a linear or exponential fade to terminal_growth_rate by the last forecast
+    # year. None keeps a single rate for the whole forecast.
+    high_growth_years: int = None
+    fade: str = "linear"
+
+
+@dataclass(frozen=True)
+class DCFResult:
+    assumptions: Assumptions
+    base_fcff: float
+    projection: pd.DataFrame
+    risk_free_rate: float
+    cost_of_debt: float
+    cost_of_equity: float
+    equity_weight: float
+    debt_weight: float
+    wacc: float
+    discounted_fcffs: np.ndarray
+    terminal_value: float
+    terminal_value_discounted: float
+    enterprise_value: float
+    equity_value: float
+    fair_value_per_share: float
+    ev_sensitivities: dict
+    fair_value_sensitivities: dict
+
+    @property
+    def projected_fcff(self):
+        return self.projection["Projected FCFF"].to_numpy()
+
+
+def build_fcff(cash_flow):
+    """Historical FCFF table from a transposed cash-flow statement in billions."""
+    cfo = cash_flow['Cash Flow From Continuing Operating Activities']
+    capex = cash_flow['Capital Expenditure']
+    fcff_df = pd.DataFrame({
+        "Cash From Operations": cfo,
+        "Capex": capex,
+        FCFF_COLUMN: cfo + capex
+    })
+    fcff_df.sort_index(ascending=True, inplace=True)
+    fcff_df.dropna(how="any", inplace=True)
+    return fcff_df
+
+
+def normalize_fundamentals(ticker, info, financials, cash_flow):
+    """Turn raw yfinance ``info`` and statement frames into Fundamentals."""
+    income_stmt = financials.T / 1e9
+    total_debt = info.get('totalDebt', 0) / 1e9
+    # Latest reported period; statements come newest first
+    interest_expense = abs(income_stmt['Interest Expense'].sort_index().dropna().iloc[-1]) if total_debt > 0 else 0
+    return Fundamentals(
+        ticker=ticker,
+        fcff_history=build_fcff(cash_flow.T / 1e9),
+        market_cap=info["marketCap"] / 1e9,
+        total_debt=total_debt,
+        cash=info.get('totalCash', 0) / 1e9,
+        interest_expense=interest_expense,
+        shares_outstanding=info['sharesOutstanding'],
+    )
+
+
+def base_fcff(fundamentals, base_years=3):
+    """Average FCFF over the last ``base_years`` years, for stability."""
+    return fundamentals.fcff_history[FCFF_COLUMN].tail(base_years).mean()
+
+
+def base_fcff_windows(fundamentals, base_years):
+    """base_fcff for each window length in ``base_years`` from one cumulative mean."""
+    history = fundamentals.fcff_history[FCFF_COLUMN].to_numpy(dtype=float)[::-1]
+    valid = ~np.isnan(history)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.cumsum(np.where(valid, history, 0)) / np.cumsum(valid)
+    window = np.clip(np.asarray(base_years, dtype=int), 1, len(history))
+    return means[window - 1]
+
+
+def cost_of_equity(risk_free_rate, beta, market_return):
+    """CAPM cost of equity; broadcasts over array inputs."""
+    return risk_free_rate + beta * (market_return - risk_free_rate)
+
+
+def cost_of_debt(fundamentals, default=0.02):
+    if fundamentals.total_debt > 0:
+        return fundamentals.interest_expense / fundamentals.total_debt
+    return default
+
+
+def capital_weights(market_cap, net_debt):
+    """Equity and debt weights of total value (market cap plus net debt)."""
+    total_value = market_cap + net_debt
+    if np.ndim(total_value):
+        zero = total_value == 0
+        safe = np.where(zero, 1, total_value)
+        return np.where(zero, 1.0, market_cap / safe), np.where(zero, 0.0, net_debt / safe)
+    if total_value == 0:
+        return 1, 0
+    return market_cap / total_value, net_debt / total_value
+
+
+def compute_wacc(equity_weight, debt_weight, cost_of_equity, cost_of_debt, tax_rate):
+    return (equity_weight * cost_of_equity) + (debt_weight * cost_of_debt * (1 - tax_rate))
+
+
+FADES = ("linear", "exponential")
+
+
+def project_fcff(base_fcff, growth_rate, forecast_years):
+    years = np.arange(1, forecast_years + 1)
+    return base_fcff * (1 + growth_rate) ** years
+
+
+def high_growth_span(forecast_years, high_growth_years):
+    """Years at the high rate; the rest of the forecast fades."""
+    if high_growth_years is None:
+        return forecast_years
+    return max(0, min(int(high_growth_years), forecast_years))
+
+
+def fade_path(growth_rate, terminal_growth_rate, fade_years, fade="linear"):
+    """Growth for each fade year, reaching terminal growth in the last one.
+
+    Broadcasts over the rates with the years on a new trailing axis. Linear
+    steps the rate itself; exponential interpolates log(1 + g), so the
+    growth factors decay geometrically.
+    """
+    growth_rate = np.asarray(growth_rate, dtype=float)[..., None]
+    terminal_growth_rate = np.asarray(terminal_growth_rate, dtype=float)[..., None]
+    step = np.arange(1, fade_years + 1) / max(fade_years, 1)
+    if fade == "linear":
+        return growth_rate + (terminal_growth_rate - growth_rate) * step
+    if fade == "exponential":
+        return (1 + growth_rate) ** (1 - step) * (1 + terminal_growth_rate) ** step - 1
+    raise ValueError(f"Unknown fade {fade!r}, expected one of {FADES}")
+
+
+def growth_schedule(growth_rate, terminal_growth_rate, forecast_years, high_growth_years=None, fade="linear"):
+    """Per-year FCFF growth over the forecast, shape (forecast_years,)."""
+    high = high_growth_span(forecast_years, high_growth_years)
+    faded = fade_path(growth_rate, terminal_growth_rate, forecast_years - high, fade)
+    return np.concatenate([np.full(high, float(growth_rate)), faded.reshape(-1)])
+
+
+def project_schedule(base_fcff, schedule):
+    """FCFF for each year of a per-year growth ``schedule``."""
+    return base_fcff * np.cumprod(1 + np.asarray(schedule, dtype=float))
+
+
+def discount(cash_flows, wacc):
+    """Discount year-end cash flows for years 1..n at ``wacc``."""
+    years = np.arange(1, len(cash_flows) + 1)
+    return cash_flows / (1 + wacc) ** years
+
+
+def terminal_value(final_fcff, terminal_growth_rate, wacc):
+    """Gordon growth value at the end of the explicit period."""
+    return final_fcff * (1 + terminal_growth_rate) / (wacc - terminal_growth_rate)
+
+
+def annuity_factor(ratio, periods, tol=1e-6):
+    """Sum of ``ratio ** t`` for t = 1..periods, broadcasting over ``ratio``.
+
+    The explicit period is a geometric series, so this is the closed form
+    q (1 - q^n) / (1 - q). Where q is within ``tol`` of 1 (growth ~ wacc) the
+    closed form loses precision and those elements are summed term by term.
+    """
+    ratio = np.asarray(ratio, dtype=float)
+    near_one = np.abs(ratio - 1) < tol
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = np.asarray(ratio * (1 - ratio ** periods) / (1 - ratio))
+    if near_one.any():
+        years = np.arange(1, periods + 1)
+        factor[near_one] = (ratio[near_one][..., None] ** years).sum(axis=-1)
+    return factor
+
+
+def annuity_factor_slope(ratio, periods, tol=1e-4):
+    """Derivative of annuity_factor with respect to ``ratio``: sum of t ratio^(t-1).
+
+    Closed form (1 - (n+1) q^n + n q^(n+1)) / (1 - q)^2, summed term by term
+    where q is within ``tol`` of 1.
+    """
+    ratio = np.asarray(ratio, dtype=float)
+    near_one = np.abs(ratio - 1) < tol
+    n = periods
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.asarray((1 - (n + 1) * ratio ** n + n * ratio ** (n + 1)) / (1 - ratio) ** 2)
+    if near_one.any():
+        years = np.arange(1, periods + 1)
+        slope[near_one] = (years * ratio[near_one][..., None] ** (years - 1)).sum(axis=-1)
+    return slope
+
+
+def enterprise_value_sensitivities(base_fcff, growth_rate, wacc, terminal_growth_rate, forecast_years,
+                                   high_growth_years=None, fade="linear"):
+    """Closed-form partials of enterprise_value; broadcasts like enterprise_value.
+
+    With q = (1 + g) / (1 + wacc), a single-stage EV is
+    B [A(q) + q^n (1 + tg) / (wacc - tg)], so every partial follows from A'(q)
+    and the chain rule through q. With a fade the cumulative growth C_t of
+    each year is differentiated through its log instead.
+    Returns a dict keyed by fcff_growth_rate, wacc and terminal_growth_rate.
+    """
+    growth_rate, wacc, terminal_growth_rate = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (growth_rate, wacc, terminal_growth_rate)))
+    n = forecast_years
+    if high_growth_span(n, high_growth_years) < n:
+        return _schedule_sensitivities(base_fcff, growth_rate, wacc, terminal_growth_rate, n,
+                                       high_growth_years, fade)
+    ratio = (1 + growth_rate) / (1 + wacc)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        spread = wacc - terminal_growth_rate
+        tv_factor = ratio ** n * (1 + terminal_growth_rate) / spread
+        d_ratio = annuity_factor_slope(ratio, n) + n * ratio ** (n - 1) * (1 + terminal_growth_rate) / spread
+        return {
+            "fcff_growth_rate": base_fcff * d_ratio / (1 + wacc),
+            "wacc": base_fcff * (-d_ratio * ratio / (1 + wacc) - tv_factor / spread),
+            "terminal_growth_rate": base_fcff * ratio ** n * (1 + wacc) / spread ** 2,
+        }
+
+
+def _schedule_sensitivities(base_fcff, growth_rate, wacc, terminal_growth_rate, n, high_growth_years, fade):
+    high = high_growth_span(n, high_growth_years)
+    g = growth_rate[..., None]
+    tg = terminal_growth_rate[..., None]
+    w = wacc[..., None]
+    step = np.arange(1, n - high + 1) / (n - high)
+    rates = np.concatenate([np.broadcast_to(g, g.shape[:-1] + (high,)),
+                            fade_path(growth_rate, terminal_growth_rate, n - high, fade)], axis=-1)
+    # d rate_t / d g and d rate_t / d tg, per year
+    if fade == "linear":
+        d_g_fade, d_tg_fade = 1 - step, step
+    else:
+        d_g_fade = (1 + rates[..., high:]) * (1 - step) / (1 + g)
+        d_tg_fade = (1 + rates[..., high:]) * step / (1 + tg)
+    d_g = np.concatenate([np.ones(rates.shape[:-1] + (high,)), np.broadcast_to(d_g_fade, rates[..., high:].shape)], axis=-1)
+    d_tg = np.concatenate([np.zeros(rates.shape[:-1] + (high,)), np.broadcast_to(d_tg_fade, rates[..., high:].shape)], axis=-1)
+    log_g = np.cumsum(d_g / (1 + rates), axis=-1)  # d log C_t / d g
+    log_tg = np.cumsum(d_tg / (1 + rates), axis=-1)
+
+    years = np.arange(1, n + 1)
+    terms = np.cumprod(1 + rates, axis=-1) / (1 + w) ** years  # C_t / (1 + wacc)^t
+    with np.errstate(divide="ignore", invalid="ignore"):
+        spread = wacc - terminal_growth_rate
+        tv = terms[..., -1] * (1 + terminal_growth_rate) / spread
+        return {
+            "fcff_growth_rate": base_fcff * ((terms * log_g).sum(axis=-1) + tv * log_g[..., -1]),
+            "wacc": base_fcff * (-(years * terms).sum(axis=-1) / (1 + wacc) - tv * n / (1 + wacc) - tv / spread),
+            "terminal_growth_rate": base_fcff * ((terms * log_tg).sum(axis=-1) + tv * log_tg[..., -1]
+                                                 + terms[..., -1] * (1 + wacc) / spread ** 2),
+        }
+
+
+def valuation_sensitivities(base_fcff, growth_rate, wacc, terminal_growth_rate, forecast_years,
+                            equity_weight, market_return, risk_free_rate, shares_outstanding,
+                            high_growth_years=None, fade="linear"):
+    """dEV and dFair-value-per-share for wacc, terminal growth, FCFF growth and beta.
+
+    Beta moves value only through the cost of equity, so dEV/dbeta is
+    dEV/dwacc times equity_weight (market_return - risk_free_rate). Net debt
+    does not depend on any of these, so per-share partials are the EV
+    partials scaled to a share.
+    """
+    ev = enterprise_value_sensitivities(base_fcff, growth_rate, wacc, terminal_growth_rate, forecast_years,
+                                        high_growth_years, fade)
+    ev["beta"] = ev["wacc"] * equity_weight * (market_return - risk_free_rate)
+    ev = {name: float(value) for name, value in ev.items()}
+    return ev, {name: per_share(value, shares_outstanding) for name, value in ev.items()}
+
+
+def enterprise_value_parts(base_fcff, growth_rate, wacc, terminal_growth_rate, forecast_years,
+                           high_growth_years=None, fade="linear"):
+    """(explicit-period PV, discounted terminal value); broadcasts over rates.
+
+    Equivalent to projecting, discounting and summing year by year, written
+    in terms of the per-year ratio (1 + g) / (1 + wacc). The high-growth phase
+    is a closed-form growing annuity, so a single-stage valuation is O(1);
+    a fade adds one cumulative product over its years.
+    """
+    growth_rate, wacc, terminal_growth_rate = np.broadcast_arrays(
+        np.asarray(growth_rate, dtype=float), np.asarray(wacc, dtype=float),
+        np.asarray(terminal_growth_rate, dtype=float))
+    high = high_growth_span(forecast_years, high_growth_years)
+    ratio = (1 + growth_rate) / (1 + wacc)
+    explicit = base_fcff * annuity_factor(ratio, high)
+    end = ratio ** high  # discounted cumulative growth at the end of the high phase
+    if high < forecast_years:
+        steps = (1 + fade_path(growth_rate, terminal_growth_rate, forecast_years - high, fade)) / (1 + wacc[..., None])
+        faded = end[..., None] * np.cumprod(steps, axis=-1)
+        explicit = explicit + base_fcff * faded.sum(axis=-1)
+        end = faded[..., -1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tv_discounted = base_fcff * end * (1 + terminal_growth_rate) / (wacc - terminal_growth_rate)
+    return explicit, tv_discounted
+
+
+def enterprise_value(base_fcff, growth_rate, wacc, terminal_growth_rate, forecast_years,
+                     high_growth_years=None, fade="linear"):
+    """Explicit-period PV plus discounted terminal value; see enterprise_value_parts."""
+    explicit, tv_discounted = enterprise_value_parts(base_fcff, growth_rate, wacc, terminal_growth_rate,
+                                                     forecast_years, high_growth_years, fade)
+    return explicit + tv_discounted
+
+
+def per_share(equity_value, shares_outstanding):
+    return (equity_value * 1e9) / shares_outstanding
+
+
+def compute_dcf(fundamentals, assumptions, risk_free_rate):
+    """Value ``fundamentals`` under ``assumptions`` and return a DCFResult."""
+    a = assumptions
+    base = base_fcff(fundamentals, a.base_years)
+    schedule = growth_schedule(a.fcff_growth_rate, a.terminal_growth_rate, a.forecast_years,
+                               a.high_growth_years, a.fade)
+    projected_fcff = project_schedule(base, schedule)
+    years = range(fundamentals.last_year + 1, fundamentals.last_year + 1 + a.forecast_years)
+    projection = pd.DataFrame({
+        "Year": list(years),
+        "Projected FCFF": projected_fcff
+    }).set_index("Year")
+
+    kd = cost_of_debt(fundamentals, a.default_cost_of_debt)
+    ke = cost_of_equity(risk_free_rate, a.beta, a.market_return)
+    equity_weight, debt_weight = capital_weights(fundamentals.market_cap, fundamentals.net_debt)
+    wacc = compute_wacc(equity_weight, debt_weight, ke, kd, a.tax_rate)
+
+    discounted_fcffs = discount(projected_fcff, wacc)
+    tv = terminal_value(projected_fcff[-1], a.terminal_growth_rate, wacc)
+    tv_discounted = tv / ((1 + wacc) ** a.forecast_years)
+
+    explicit_pv, _ = enterprise_value_parts(base, a.fcff_growth_rate, wacc, a.terminal_growth_rate,
+                                            a.forecast_years, a.high_growth_years, a.fade)
+    ev = float(explicit_pv) + tv_discounted
+    equity_value = ev - fundamentals.net_debt
+    ev_sens, fv_sens = valuation_sensitivities(base, a.fcff_growth_rate, wacc, a.terminal_growth_rate,
+                                               a.forecast_years, equity_weight, a.market_return,
+                                               risk_free_rate, fundamentals.shares_outstanding,
+                                               a.high_growth_years, a.fade)
+    return DCFResult(
+        assumptions=a,
+        base_fcff=base,
+        projection=projection,
+        risk_free_rate=risk_free_rate,
+        cost_of_debt=kd,
+        cost_of_equity=ke,
+        equity_weight=equity_weight,
+        debt_weight=debt_weight,
+        wacc=wacc,
+        discounted_fcffs=discounted_fcffs,
+        terminal_value=tv,
+        terminal_value_discounted=tv_discounted,
+        enterprise_value=ev,
+        equity_value=equity_value,
+        fair_value_per_share=per_share(equity_value, fundamentals.shares_outstanding),
+        ev_sensitivities=ev_sens,
+        fair_value_sensitivities=fv_sens,
+    )
+
+
+def assumptions_frame(scenarios):
+    """One row per Assumptions in ``scenarios``, one column per field."""
+    return pd.DataFrame([asdict(a) for a in scenarios], columns=list(Assumptions.__dataclass_fields__))
+
+
+def value_scenarios(fundamentals, risk_free_rate, scenarios):
+    """Fair value per share for every row of an assumptions_frame, as one batch.
+
+    Every input broadcasts across rows, so the whole frame is one array
+    expression per distinct (forecast_years, high_growth_years, fade), the
+    only settings that change the shape of the projection. Rows where WACC
+    does not exceed terminal growth come back NaN.
+    """
+    s = scenarios
+
+    def column(name):
+        return s[name].to_numpy(dtype=float)
+
+    base = base_fcff_windows(fundamentals, s["base_years"].to_numpy())
+    kd = np.where(fundamentals.total_debt > 0, cost_of_debt(fundamentals), column("default_cost_of_debt"))
+    equity_weight, debt_weight = capital_weights(fundamentals.market_cap, fundamentals.net_debt)
+    ke = cost_of_equity(risk_free_rate, column("beta"), column("market_return"))
+    wacc = compute_wacc(equity_weight, debt_weight, ke, kd, column("tax_rate"))
+    growth, terminal = column("fcff_growth_rate"), column("terminal_growth_rate")
+
+    ev = np.empty(len(s))
+    shapes = s[["forecast_years", "high_growth_years", "fade"]].astype(object)
+    for (n, high, fade), rows in shapes.groupby(list(shapes), dropna=False, sort=False).indices.items():
+        high = None if pd.isna(high) else int(high)
+        ev[rows] = enterprise_value(base[rows], growth[rows], wacc[rows], terminal[rows], int(n), high, fade)
+    values = per_share(ev - fundamentals.net_debt, fundamentals.shares_outstanding)
+    return np.where(wacc > terminal, values, np.nan)
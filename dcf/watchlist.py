@@ -0,0 +1,142 @@
+"""Keep a watchlist's valuations current from fresh quotes alone.
+
+A market cap move leaves base FCFF, its projection and the cost of debt
+untouched; it only shifts the capital weights, and through them WACC,
+enterprise value and fair value, plus the price fair value is compared
+with. Watchlist.load() reads every name's cached statements once;
+refresh() then re-quotes the list and recomputes just those nodes for all
+names as one array expression. Quotes come straight from the provider, not
+the shared QUOTE_TTL cache, so each refresh sees the latest price whatever
+the interval.
+
+    python -m dcf.watchlist --tickers MSFT AAPL NVDA --interval 60
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .batch import read_tickers
+from .fetch import FetchError, fetch_all
+from .providers import get_provider
+from .ratelimit import scheduler_stats
+from .rates import get_risk_free_rate
+from .valuation import (Assumptions, base_fcff, capital_weights, compute_wacc, cost_of_debt, cost_of_equity,
+                        enterprise_value, normalize_fundamentals, per_share)
+
+# Separate from fetch's pool: fetch_all submits to that one and waits on it
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="dcf-watchlist")
+
+
+class Watchlist:
+    def __init__(self, tickers, assumptions=None, risk_free_rate=None):
+        self.tickers = list(dict.fromkeys(t.strip().upper() for t in tickers))
+        self.assumptions = assumptions or Assumptions()
+        self.risk_free_rate = risk_free_rate
+        self.errors = {}  # ticker -> reason for the last failed load or quote
+        self._names = []
+        self._fixed = None  # per-name inputs that do not move with price
+        self._quotes = {}
+
+    def _load_one(self, ticker):
+        data = fetch_all(ticker, risk_free_rate=self.risk_free_rate)
+        return normalize_fundamentals(ticker, data.info, data.financials, data.cash_flow)
+
+    def load(self):
+        """Fetch (mostly from cache) and fix everything a price move cannot change."""
+        if self.risk_free_rate is None:
+            self.risk_free_rate = get_risk_free_rate()
+        a = self.assumptions
+        self._names, rows = [], []
+        for ticker, future in [(t, _executor.submit(self._load_one, t)) for t in self.tickers]:
+            try:
+                f = future.result()
+            except FetchError as e:
+                self.errors[ticker] = f"{e.source}: {e.reason}"
+                continue
+            except Exception as e:
+                self.errors[ticker] = f"{type(e).__name__}: {e}"
+                continue
+            self._names.append(ticker)
+            self._quotes[ticker] = {"marketCap": f.market_cap * 1e9, "sharesOutstanding": f.shares_outstanding}
+            rows.append((base_fcff(f, a.base_years), cost_of_debt(f, a.default_cost_of_debt), f.net_debt))
+        self._fixed = np.array(rows, dtype=float).reshape(-1, 3)
+        return self
+
+    def _quote(self, ticker):
+        try:
+            self._quotes[ticker] = get_provider().quote(ticker)
+            self.errors.pop(ticker, None)
+        except Exception as e:  # keep the last good quote
+            self.errors[ticker] = f"quote: {type(e).__name__}: {e}"
+
+    def refresh(self):
+        """Re-quote every loaded name and revalue it; returns a frame indexed by ticker."""
+        if self._fixed is None:
+            self.load()
+        list(_executor.map(self._quote, self._names))
+        a = self.assumptions
+        base, kd, net_debt = self._fixed.T
+        market_cap = np.array([self._quotes[t]["marketCap"] for t in self._names], dtype=float) / 1e9
+        shares = np.array([self._quotes[t]["sharesOutstanding"] for t in self._names], dtype=float)
+
+        equity_weight, debt_weight = capital_weights(market_cap, net_debt)
+        ke = cost_of_equity(self.risk_free_rate, a.beta, a.market_return)
+        wacc = compute_wacc(equity_weight, debt_weight, ke, kd, a.tax_rate)
+        ev = enterprise_value(base, a.fcff_growth_rate, wacc, a.terminal_growth_rate, a.forecast_years,
+                              a.high_growth_years, a.fade)
+        fair_value = np.where(wacc > a.terminal_growth_rate, per_share(ev - net_debt, shares), np.nan)
+        price = market_cap * 1e9 / shares
+        return pd.DataFrame({
+            "price": price,
+            "fair_value_per_share": fair_value,
+            "upside": fair_value / price - 1,
+            "market_cap": market_cap,
+            "equity_weight": equity_weight,
+            "wacc": wacc,
+            "enterprise_value": ev,
+        }, index=pd.Index(self._names, name="ticker"))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dcf.watchlist",
+                                     description="Keep a watchlist's fair values current from fresh quotes.")
+    parser.add_argument("ticker_file", nargs="?", help="text file of tickers or CSV constituent list")
+    parser.add_argument("--tickers", nargs="+", default=[], help="tickers given inline")
+    parser.add_argument("--interval", type=float, default=60.0, help="seconds between refreshes")
+    parser.add_argument("--count", type=int, default=0, help="stop after this many refreshes (0: run until stopped)")
+    parser.add_argument("--risk-free-rate", type=float, default=None, help="percent; defaults to the latest FRED DGS10")
+    args = parser.parse_args(argv)
+    if not args.ticker_file and not args.tickers:
+        parser.error("give a ticker file or --tickers")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    tickers = (read_tickers(args.ticker_file) if args.ticker_file else []) + args.tickers
+    risk_free_rate = None if args.risk_free_rate is None else args.risk_free_rate / 100
+    watchlist = Watchlist(tickers, risk_free_rate=risk_free_rate).load()
+    refreshes = 0
+    while True:
+        started = time.monotonic()
+        table = watchlist.refresh()
+        print(time.strftime("%Y-%m-%d %H:%M:%S"), f"{len(table)} names, {time.monotonic() - started:.2f}s")
+        print(table.to_string(float_format="{:.4g}".format))
+        for ticker, reason in watchlist.errors.items():
+            print(f"{ticker}: {reason}", file=sys.stderr)
+        for stats in scheduler_stats().values():
+            print(f"{stats['service']}: queue={stats['queue_depth']} requests={stats['requests']} "
+                  f"retries={stats['retries']} mean_wait={stats['mean_wait']:.2f}s", file=sys.stderr)
+        sys.stdout.flush()
+        refreshes += 1
+        if args.count and refreshes >= args.count:
+            return 0
+        time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+"""Batch output stays valid for strict consumers."""
+import json
+
+import numpy as np
+
+from dcf.batch import JsonlWriter, _record
+
+
+def test_jsonl_writes_non_finite_values_as_null(tmp_path):
+    path = str(tmp_path / "valuations.jsonl")
+    writer = JsonlWriter(path)
+    writer.write(_record("MSFT", status="ok", price=420.5, implied_fcff_growth=float("nan"),
+                         upside=np.float64("-inf")))
+    writer.close()
+    with open(path) as fh:
+        record = json.loads(fh.read(), parse_constant=_reject_constant)
+    assert record["price"] == 420.5
+    assert record["implied_fcff_growth"] is None and record["upside"] is None
+
+
+def _reject_constant(token):
+    raise AssertionError(f"non-standard JSON constant {token}")
@@ -0,0 +1,122 @@
+"""ttl_cache: expiry and single-flight coalescing of concurrent misses."""
+import threading
+import time
+
+import pytest
+
+from dcf.cache import _MISSING, SingleFlight, ttl_cache
+
+
+def run_concurrently(func, n=8):
+    """Call ``func`` from ``n`` threads released together; returns results or exceptions."""
+    barrier = threading.Barrier(n)
+    results = [None] * n
+
+    def call(i):
+        barrier.wait()
+        try:
+            results[i] = func()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_misses_share_one_call():
+    calls = []
+
+    @ttl_cache(ttl=60)
+    def fetch(ticker):
+        calls.append(ticker)
+        time.sleep(0.2)
+        return {"ticker": ticker}
+
+    results = run_concurrently(lambda: fetch("MSFT"))
+    assert calls == ["MSFT"]
+    assert all(r is results[0] for r in results)
+    assert fetch.flight.shared == len(results) - 1
+    assert fetch("MSFT") is results[0] and calls == ["MSFT"]
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    @ttl_cache(ttl=60)
+    def fetch(ticker):
+        time.sleep(0.2)
+        return ticker
+
+    started = time.monotonic()
+    tickers = iter(["A", "B", "C", "D"])
+    lock = threading.Lock()
+
+    def next_fetch():
+        with lock:
+            ticker = next(tickers)
+        return fetch(ticker)
+
+    assert sorted(run_concurrently(next_fetch, n=4)) == ["A", "B", "C", "D"]
+    assert time.monotonic() - started < 0.6
+
+
+def test_errors_are_shared_but_not_cached():
+    calls = []
+
+    @ttl_cache(ttl=60)
+    def fetch(ticker):
+        calls.append(ticker)
+        time.sleep(0.1)
+        raise ConnectionError("throttled")
+
+    results = run_concurrently(lambda: fetch("MSFT"), n=4)
+    assert all(isinstance(r, ConnectionError) for r in results) and len(calls) == 1
+    with pytest.raises(ConnectionError):
+        fetch("MSFT")
+    assert len(calls) == 2
+
+
+def test_entries_expire_after_ttl():
+    calls = []
+
+    @ttl_cache(ttl=0.05)
+    def fetch(ticker):
+        calls.append(ticker)
+        return len(calls)
+
+    assert fetch("MSFT") == 1 and fetch("MSFT") == 1
+    time.sleep(0.1)
+    assert fetch("MSFT") == 2
+
+
+def test_late_caller_reuses_a_result_stored_after_its_miss():
+    """A caller that missed just before the leader stored must not fetch again."""
+    calls = []
+
+    @ttl_cache(ttl=60)
+    def fetch(ticker):
+        calls.append(ticker)
+        return "fresh"
+
+    key = (("MSFT",), ())
+    get = fetch.cache.get
+    missed = []
+
+    def get_after_leader(k, default=None):
+        if not missed:
+            missed.append(k)
+            fetch.cache.set(key, "leader")  # the leader finishes between this miss and flight.do()
+            return _MISSING
+        return get(k, default)
+
+    fetch.cache.get = get_after_leader
+    assert fetch("MSFT") == "leader"
+    assert calls == []
+
+
+def test_single_flight_key_is_released_after_each_call():
+    flight = SingleFlight()
+    assert flight.do("k", lambda: 1) == 1
+    assert flight.do("k", lambda: 2) == 2
@@ -0,0 +1,69 @@
+"""fetch_all timeouts count a source's own work but not its rate-limiter waits."""
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from dcf import fetch
+from dcf.cache import ttl_cache
+from dcf.fetch import FetchError, fetch_all
+from dcf.ratelimit import Scheduler
+
+INFO = {"marketCap": 3.1e12, "totalDebt": 97e9, "totalCash": 75e9, "sharesOutstanding": 7.43e9}
+TIMEOUTS = dict.fromkeys(fetch.TIMEOUTS, 0.3)
+
+
+def use_sources(monkeypatch, source):
+    """Serve every input through ``source(name, value)``."""
+    values = {"info": INFO, "financials": pd.DataFrame(), "balance_sheet": pd.DataFrame(),
+              "cash_flow": pd.DataFrame(), "risk_free_rate": 0.042}
+    monkeypatch.setattr(fetch, "_sources", lambda ticker, risk_free_rate=None: {
+        name: (lambda name=name: source(name, values[name])) for name in values})
+
+
+def test_limiter_wait_is_not_counted(monkeypatch):
+    scheduler = Scheduler("test", rate=5, burst=1)
+    use_sources(monkeypatch, lambda name, value: scheduler.call(lambda: value))
+    started = time.monotonic()
+    data = fetch_all("MSFT", timeouts=TIMEOUTS)
+    # Five calls at 5/s: the last is granted well after every source's 0.3s timeout
+    assert time.monotonic() - started > 0.6
+    assert data.info == INFO and data.risk_free_rate == 0.042
+
+
+def test_slow_request_after_grant_times_out(monkeypatch):
+    scheduler = Scheduler("test", rate=100)
+    use_sources(monkeypatch, lambda name, value: scheduler.call(lambda: time.sleep(1) or value))
+    with pytest.raises(FetchError, match="info for MSFT: timed out after 0.3s"):
+        fetch_all("MSFT", timeouts=TIMEOUTS)
+
+
+def test_wait_outside_the_limiter_is_counted(monkeypatch):
+    release = threading.Event()
+    use_sources(monkeypatch, lambda name, value: release.wait(5) and value)
+    started = time.monotonic()
+    try:
+        with pytest.raises(FetchError, match="timed out"):
+            fetch_all("MSFT", timeouts=TIMEOUTS)
+        assert time.monotonic() - started < 1
+    finally:
+        release.set()
+
+
+def test_single_flight_follower_times_out(monkeypatch):
+    """A second fetch sharing the leader's slow in-flight call still honours its own timeout."""
+    @ttl_cache(ttl=60)
+    def slow(name):
+        time.sleep(1.5)
+        return name
+
+    use_sources(monkeypatch, lambda name, value: slow(name) and value)
+    leader = threading.Thread(target=fetch_all, args=("MSFT",), kwargs={"timeouts": dict.fromkeys(TIMEOUTS, 5)})
+    leader.start()
+    time.sleep(0.1)
+    started = time.monotonic()
+    with pytest.raises(FetchError, match="timed out"):
+        fetch_all("MSFT", timeouts=TIMEOUTS)
+    assert time.monotonic() - started < 1
+    leader.join()
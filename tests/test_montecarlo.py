@@ -0,0 +1,55 @@
+"""Seeded Monte Carlo runs give the same answer however they are split."""
+import numpy as np
+import pytest
+
+from dcf.montecarlo import DrawCache, default_distributions, simulate, simulate_parallel
+from dcf.streaming import simulate_streaming
+from dcf.valuation import Assumptions
+
+from .test_valuation import RISK_FREE_RATE, make_fundamentals
+
+SETTINGS = {"n_paths": 50_000, "seed": 7, "chunk_size": 8_000}
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    assumptions = Assumptions(high_growth_years=4, fade="exponential")
+    return make_fundamentals(), assumptions, RISK_FREE_RATE, default_distributions(assumptions)
+
+
+def test_parallel_matches_serial(inputs):
+    serial = simulate(*inputs, **SETTINGS)
+    parallel = simulate_parallel(*inputs, **SETTINGS, workers=3)
+    np.testing.assert_array_equal(parallel.values, serial.values)
+
+
+def test_draw_cache_does_not_change_paths(inputs):
+    cache = DrawCache()
+    first = simulate(*inputs, **SETTINGS, cache=cache)
+    again = simulate(*inputs, **SETTINGS, cache=cache)
+    np.testing.assert_array_equal(first.values, simulate(*inputs, **SETTINGS).values)
+    np.testing.assert_array_equal(again.values, first.values)
+
+
+def test_streaming_is_independent_of_workers(inputs):
+    one = simulate_streaming(*inputs, **SETTINGS, workers=1)
+    three = simulate_streaming(*inputs, **SETTINGS, workers=3)
+    assert (one.n_paths, one.n_valid, one.n_above) == (three.n_paths, three.n_valid, three.n_above)
+    assert one.mean() == three.mean() and one.std() == three.std()
+    assert one.percentiles() == three.percentiles()
+    np.testing.assert_array_equal(one.histogram()[0], three.histogram()[0])
+
+
+def test_streaming_matches_stored_paths(inputs):
+    exact = simulate(*inputs, **SETTINGS)
+    summary = simulate_streaming(*inputs, **SETTINGS)
+    assert summary.n_paths == exact.n_paths
+    assert summary.invalid_fraction == exact.invalid_fraction
+    assert summary.prob_above() == exact.prob_above()
+    assert summary.mean() == pytest.approx(exact.mean(), rel=1e-12)
+    assert summary.std() == pytest.approx(exact.std(), rel=1e-9)
+    counts, edges = summary.histogram()
+    np.testing.assert_array_equal(counts, exact.histogram(bins=edges)[0])
+    spread = np.subtract(*np.percentile(exact.valid, [95, 5]))
+    for q, value in summary.percentiles().items():
+        assert value == pytest.approx(exact.percentiles((q,))[q], abs=0.01 * spread)
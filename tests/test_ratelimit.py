@@ -0,0 +1,96 @@
+"""Token-bucket pacing, retries and the transient-error test."""
+import time
+
+import pytest
+import requests
+
+from dcf.ratelimit import Scheduler, TokenBucket, is_transient, on_token, parse_rates
+
+
+def test_bucket_paces_calls_after_the_burst():
+    bucket = TokenBucket(rate=20, burst=2)
+    started = time.monotonic()
+    waits = [bucket.acquire() for _ in range(6)]
+    elapsed = time.monotonic() - started
+    assert waits[:2] == [0.0, 0.0]
+    assert all(w > 0 for w in waits[2:])
+    # Four calls beyond the burst at 20/s
+    assert 0.18 <= elapsed < 0.4
+
+
+def test_retries_transient_errors_then_succeeds():
+    scheduler = Scheduler("test", rate=1000, backoff=0.001)
+    failures = iter([ConnectionError("reset"), requests.exceptions.ReadTimeout("slow")])
+
+    def flaky():
+        error = next(failures, None)
+        if error:
+            raise error
+        return "ok"
+
+    assert scheduler.call(flaky) == "ok"
+    stats = scheduler.stats()
+    assert (stats["requests"], stats["retries"], stats["failures"]) == (3, 2, 0)
+
+
+def test_does_not_retry_missing_data():
+    scheduler = Scheduler("test", rate=1000, backoff=0.001)
+    calls = []
+
+    def missing():
+        calls.append(1)
+        raise KeyError("totalDebt")
+
+    with pytest.raises(KeyError):
+        scheduler.call(missing)
+    assert len(calls) == 1 and scheduler.stats()["failures"] == 1
+
+
+def test_gives_up_after_the_last_retry():
+    scheduler = Scheduler("test", rate=1000, retries=2, backoff=0.001)
+    with pytest.raises(TimeoutError):
+        scheduler.call(lambda: (_ for _ in ()).throw(TimeoutError("read timed out")))
+    stats = scheduler.stats()
+    assert (stats["requests"], stats["retries"], stats["failures"]) == (3, 2, 1)
+
+
+def test_on_token_brackets_each_wait():
+    scheduler = Scheduler("test", rate=1000, backoff=0.001)
+    events, failures = [], iter([ConnectionError()])
+
+    def flaky():
+        events.append("call")
+        error = next(failures, None)
+        if error:
+            raise error
+
+    with on_token(events.append):
+        scheduler.call(flaky)
+    scheduler.call(lambda: None)  # outside the block: not reported
+    assert events == [False, True, "call", False, False, True, "call"]
+
+
+def response(status):
+    r = requests.Response()
+    r.status_code = status
+    return r
+
+
+@pytest.mark.parametrize("error, transient", [
+    (type("YFRateLimitError", (Exception,), {})("Too Many Requests"), True),
+    (requests.exceptions.ConnectTimeout(), True),
+    (requests.exceptions.HTTPError(response=response(429)), True),
+    (requests.exceptions.HTTPError(response=response(503)), True),
+    (requests.exceptions.HTTPError(response=response(404)), False),
+    (ConnectionResetError(), True),
+    (ValueError("500 rows for period 2024, ticker 429"), False),
+    (RuntimeError("HTTP 502 in the message only"), False),
+    (KeyError("503"), False),
+])
+def test_is_transient(error, transient):
+    assert is_transient(error) is transient
+
+
+def test_parse_rates_overrides_defaults():
+    assert parse_rates("yahoo=0.5") == {"yahoo": 0.5, "fred": 1.0}
+    assert parse_rates(None) == {"yahoo": 2.0, "fred": 1.0}
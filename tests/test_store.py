@@ -0,0 +1,88 @@
+"""FundamentalsStore asks the provider only when a new fiscal period can exist."""
+import pandas as pd
+import pytest
+
+from dcf.store import FundamentalsStore
+
+
+def statement(*period_ends):
+    periods = pd.DatetimeIndex(sorted(pd.to_datetime(period_ends), reverse=True))
+    return pd.DataFrame([[1e9 * (i + 1) for i in range(len(periods))], [2e9] * len(periods)],
+                        index=["Total Revenue", "Interest Expense"], columns=periods)
+
+
+def days_ago(days):
+    return (pd.Timestamp.today().normalize() - pd.Timedelta(days=days)).date().isoformat()
+
+
+class FakeStore(FundamentalsStore):
+    """Store whose provider serves ``self.frame`` and counts calls."""
+
+    def __init__(self, path, frame, **kwargs):
+        super().__init__(path, **kwargs)
+        self.frame = frame
+        self.calls = 0
+
+    def _fetch(self, ticker, kind):
+        self.calls += 1
+        return self.frame
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "fundamentals.sqlite")
+
+
+def test_not_called_before_next_period_end(path):
+    store = FakeStore(path, statement(days_ago(400), days_ago(30)), refresh_interval=0)
+    first = store.statement("MSFT", "financials")
+    assert store.calls == 1
+    assert list(first.columns) == list(store.frame.columns)
+    # The latest stored period ended 30 days ago: the next cannot exist for another 11 months
+    assert FakeStore(path, statement(days_ago(1))).statement("MSFT", "financials").equals(first)
+    assert store.statement("MSFT", "financials").equals(first) and store.calls == 1
+
+
+def test_new_period_appended_once_due(path):
+    store = FakeStore(path, statement(days_ago(735), days_ago(370)), refresh_interval=0)
+    store.statement("MSFT", "financials")
+    # A year has passed since the latest period end, so the next one is polled for straight away
+    store.frame = statement(days_ago(735), days_ago(370), days_ago(5))
+    assert store.refresh("MSFT", "financials") == 1
+    assert store.periods("MSFT", "financials") == list(pd.to_datetime([days_ago(735), days_ago(370), days_ago(5)]))
+    assert store.calls == 2
+
+
+def test_due_period_polled_once_per_interval(path):
+    store = FakeStore(path, statement(days_ago(370)), refresh_interval=3600)
+    store.statement("MSFT", "financials")
+    store.statement("MSFT", "financials")
+    assert store.calls == 1
+    store.refresh_interval = 0
+    store.statement("MSFT", "financials")
+    assert store.calls == 2
+
+
+def test_only_newer_periods_appended(path):
+    original = statement(days_ago(735), days_ago(370))
+    store = FakeStore(path, original, refresh_interval=0)
+    store.statement("MSFT", "financials")
+    # A restated old period is not rewritten; only the new one is added
+    store.frame = statement(days_ago(735), days_ago(370), days_ago(5)) * 2
+    store.refresh("MSFT", "financials")
+    stored = store.statement("MSFT", "financials")
+    for period in pd.to_datetime([days_ago(735), days_ago(370)]):
+        assert stored[period].tolist() == original[period].tolist()
+    assert stored[pd.Timestamp(days_ago(5))].tolist() == store.frame[pd.Timestamp(days_ago(5))].tolist()
+
+
+def test_empty_response_is_not_remembered(path):
+    store = FakeStore(path, pd.DataFrame(), refresh_interval=86400)
+    with pytest.raises(LookupError):
+        store.statement("MSFT", "financials")
+    # The provider recovers: the next call asks again instead of serving the empty result for a day
+    store.frame = statement(days_ago(400), days_ago(30))
+    assert list(store.statement("MSFT", "financials").columns) == list(store.frame.columns)
+    assert store.calls == 2
+    # Surviving a restart: the check recorded on disk now belongs to real rows
+    assert not FakeStore(path, pd.DataFrame()).statement("MSFT", "financials").empty
@@ -0,0 +1,139 @@
+"""Closed-form valuation checked against the year-by-year computation it replaces."""
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dcf.valuation import (Assumptions, assumptions_frame, compute_dcf, enterprise_value,
+                           enterprise_value_sensitivities, normalize_fundamentals, value_scenarios)
+
+RISK_FREE_RATE = 0.042
+
+
+def make_fundamentals():
+    dates = pd.to_datetime(["2024-06-30", "2023-06-30", "2022-06-30", "2021-06-30"])
+    cash_flow = pd.DataFrame([[118.5e9, 87.6e9, 89.0e9, 76.7e9], [-44.5e9, -28.1e9, -23.9e9, -20.6e9]],
+                             index=["Cash Flow From Continuing Operating Activities", "Capital Expenditure"],
+                             columns=dates)
+    financials = pd.DataFrame([[2.9e9, 1.9e9, 2.0e9, np.nan]], index=["Interest Expense"], columns=dates)
+    info = {"marketCap": 3.1e12, "totalDebt": 97e9, "totalCash": 75e9, "sharesOutstanding": 7.43e9}
+    return normalize_fundamentals("MSFT", info, financials, cash_flow)
+
+
+def loop_rates(growth, terminal, n, high=None, fade="linear"):
+    """Per-year growth written out the long way."""
+    high = n if high is None else min(high, n)
+    m = n - high
+    rates = [growth] * high
+    for k in range(1, m + 1):
+        if fade == "linear":
+            rates.append(growth + (terminal - growth) * k / m)
+        else:
+            rates.append((1 + growth) ** (1 - k / m) * (1 + terminal) ** (k / m) - 1)
+    return rates
+
+
+def loop_enterprise_value(base, rates, wacc, terminal):
+    """Project, discount and sum year by year, then add the discounted Gordon terminal value."""
+    fcff, pv = base, 0.0
+    for year, rate in enumerate(rates, 1):
+        fcff *= 1 + rate
+        pv += fcff / (1 + wacc) ** year
+    return pv + fcff * (1 + terminal) / (wacc - terminal) / (1 + wacc) ** len(rates)
+
+
+CASES = [
+    (0.14, 0.08, 0.05, 10),
+    (0.0, 0.09, 0.0, 5),
+    (0.30, 0.11, 0.10, 15),
+    (0.08, 0.08, 0.03, 10),  # growth equal to wacc: the annuity's near-one branch
+    (-0.05, 0.07, 0.02, 7),
+]
+STAGES = [(None, "linear"), (3, "linear"), (3, "exponential"), (0, "linear"), (6, "exponential")]
+
+
+@pytest.mark.parametrize("growth, wacc, terminal, n", CASES)
+@pytest.mark.parametrize("high, fade", STAGES)
+def test_enterprise_value_matches_yearly_loop(growth, wacc, terminal, n, high, fade):
+    expected = loop_enterprise_value(25.0, loop_rates(growth, terminal, n, high, fade), wacc, terminal)
+    assert enterprise_value(25.0, growth, wacc, terminal, n, high, fade) == pytest.approx(expected, rel=1e-10)
+
+
+def test_enterprise_value_broadcasts_over_rates():
+    growth = np.array([0.0, 0.14, 0.3])
+    wacc = np.array([[0.07], [0.09]])
+    values = enterprise_value(25.0, growth, wacc, 0.03, 10, 4, "exponential")
+    assert values.shape == (2, 3)
+    for i, w in enumerate(wacc[:, 0]):
+        for j, g in enumerate(growth):
+            expected = loop_enterprise_value(25.0, loop_rates(g, 0.03, 10, 4, "exponential"), w, 0.03)
+            assert values[i, j] == pytest.approx(expected, rel=1e-10)
+
+
+def test_compute_dcf_matches_original_page():
+    """The page's original procedure, inlined, for the default assumptions."""
+    f = make_fundamentals()
+    a = Assumptions()
+    history = f.fcff_history["Free Cash Flow To The Firm"]
+    base = history.tail(a.base_years).mean()
+    projected = [base * (1 + a.fcff_growth_rate) ** year for year in range(1, a.forecast_years + 1)]
+    ke = RISK_FREE_RATE + a.beta * (a.market_return - RISK_FREE_RATE)
+    kd = f.interest_expense / f.total_debt
+    total = f.market_cap + f.net_debt
+    wacc = f.market_cap / total * ke + f.net_debt / total * kd * (1 - a.tax_rate)
+    pv = sum(fcff / (1 + wacc) ** year for year, fcff in enumerate(projected, 1))
+    tv = projected[-1] * (1 + a.terminal_growth_rate) / (wacc - a.terminal_growth_rate)
+    ev = pv + tv / (1 + wacc) ** a.forecast_years
+    fair_value = (ev - f.net_debt) * 1e9 / f.shares_outstanding
+
+    result = compute_dcf(f, a, RISK_FREE_RATE)
+    assert result.enterprise_value == pytest.approx(ev, rel=1e-12)
+    assert result.fair_value_per_share == pytest.approx(fair_value, rel=1e-12)
+    np.testing.assert_allclose(result.projected_fcff, projected, rtol=1e-12)
+
+
+@pytest.mark.parametrize("growth, wacc, terminal, n", CASES)
+@pytest.mark.parametrize("high, fade", STAGES)
+def test_sensitivities_match_finite_differences(growth, wacc, terminal, n, high, fade):
+    args = {"growth_rate": growth, "wacc": wacc, "terminal_growth_rate": terminal}
+    partials = enterprise_value_sensitivities(25.0, growth, wacc, terminal, n, high, fade)
+    h = 1e-6
+    for name, key in (("fcff_growth_rate", "growth_rate"), ("wacc", "wacc"),
+                      ("terminal_growth_rate", "terminal_growth_rate")):
+        up = enterprise_value(25.0, **{**args, key: args[key] + h}, forecast_years=n, high_growth_years=high,
+                              fade=fade)
+        down = enterprise_value(25.0, **{**args, key: args[key] - h}, forecast_years=n, high_growth_years=high,
+                                fade=fade)
+        assert float(partials[name]) == pytest.approx((up - down) / (2 * h), rel=1e-5, abs=1e-6), name
+
+
+@pytest.mark.parametrize("high, fade", STAGES)
+def test_beta_sensitivity_matches_finite_difference(high, fade):
+    f = make_fundamentals()
+    a = Assumptions(high_growth_years=high, fade=fade)
+    h = 1e-6
+    up = compute_dcf(f, replace(a, beta=a.beta + h), RISK_FREE_RATE).fair_value_per_share
+    down = compute_dcf(f, replace(a, beta=a.beta - h), RISK_FREE_RATE).fair_value_per_share
+    beta = compute_dcf(f, a, RISK_FREE_RATE).fair_value_sensitivities["beta"]
+    assert beta == pytest.approx((up - down) / (2 * h), rel=1e-5)
+
+
+def test_value_scenarios_matches_compute_dcf():
+    f = make_fundamentals()
+    scenarios = [
+        Assumptions(),
+        Assumptions(forecast_years=5, fcff_growth_rate=0.08, beta=1.3, base_years=2),
+        Assumptions(high_growth_years=4, fade="exponential", terminal_growth_rate=0.03),
+        Assumptions(high_growth_years=2, market_return=0.1, tax_rate=0.25),
+        Assumptions(terminal_growth_rate=0.2),  # wacc below terminal growth
+    ]
+    values = value_scenarios(f, RISK_FREE_RATE, assumptions_frame(scenarios))
+    for a, value in zip(scenarios[:-1], values):
+        assert value == pytest.approx(compute_dcf(f, a, RISK_FREE_RATE).fair_value_per_share, rel=1e-10)
+    assert np.isnan(values[-1])
+
+
+def test_interest_expense_from_latest_period():
+    # Statements are newest first; the 2024 figure, not the oldest reported one, sets the cost of debt
+    assert make_fundamentals().interest_expense == pytest.approx(2.9)